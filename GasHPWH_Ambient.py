@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:30:00 2020
+
+This module creates time-varying ambient temperatures for the gas HPWH model from hourly weather data. The simulation scripts assume the
+HPWH is surrounded by 68 deg F air, which is reasonable for units installed in conditioned space but not for units installed in garages or
+outdoors. The interpolated outdoor temperatures are cached for each weather file and timestep.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import os
+import hashlib
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+import GasHPWH_DrawProfile_Cache
+
+Cache_Version = 1 #Increment when the interpolation changes, so old cache files are not used
+Folder_Cache = os.path.dirname(os.path.abspath(__file__)) + os.sep + 'Data' + os.sep + 'Cache' + os.sep + 'Ambient' #Default location of the cache files
+Max_Size_Cache = 256 * 1024 ** 2 #bytes, the least recently used cache files are deleted when the cache folder grows beyond this size. A year at a 1 minute timestep takes 4 MB
+
+def Interpolate_Hourly(Temperature_Hourly, Timestep, Length = None):
+    #Returns the temperature at the start of each timestep, linearly interpolated between hourly values. Length is the number of timesteps,
+    #defaulting to the number covered by the hourly values. Each hourly value is the temperature at the end of its hour, matching the E+ weather
+    #file convention, and timesteps before the first hour use the first value
+    Temperature_Hourly = np.asarray(Temperature_Hourly, dtype = float)
+    if Length is None:
+        Length = int(round(len(Temperature_Hourly) * 60 / Timestep))
+    Time_Hourly = np.arange(1, len(Temperature_Hourly) + 1) * 60. #The time at the end of each hour, in minutes
+    return np.interp(np.arange(Length) * Timestep, Time_Hourly, Temperature_Hourly)
+
+def Load_Temperature_Outdoor(Path_Weather, Timestep, Folder = None, Max_Size = None):
+    #Returns the outdoor dry bulb temperature (deg F) at the start of every timestep in the E+ weather file at Path_Weather, reading it from the
+    #cache if possible and adding it to the cache if not. The returned array is a read-only memory map. Copy it before modifying it
+    if Folder is None:
+        Folder = Folder_Cache
+    if Max_Size is None:
+        Max_Size = Max_Size_Cache
+
+    with open(Path_Weather, 'rb') as File:
+        Hash_Contents = hashlib.sha1(File.read()).hexdigest()
+    Key = '{0}|{1!r}|{2}'.format(Hash_Contents, float(Timestep), Cache_Version)
+    Path_Cache = Folder + os.sep + hashlib.sha1(Key.encode()).hexdigest() + '.npy'
+    if os.path.exists(Path_Cache):
+        os.utime(Path_Cache) #Mark the file as recently used
+        return np.load(Path_Cache, mmap_mode = 'r')
+
+    Weather = GasHPWH_Support.EnergyPlus_Weather_Reader(Path_Weather, 'IP')
+    Temperature_Outdoor = Interpolate_Hourly(Weather['Dry Bulb Temperature (deg F)'], Timestep)
+
+    os.makedirs(Folder, exist_ok = True)
+    GasHPWH_Support.Write_Atomic(Path_Cache, lambda File: np.save(File, Temperature_Outdoor))
+    GasHPWH_DrawProfile_Cache.Evict_Cache(Folder, Max_Size)
+    return np.load(Path_Cache, mmap_mode = 'r')
+
+def Temperature_Ambient(Path_Weather, Timestep, Length, Fraction_Outdoor = 1, Temperature_Indoor = 68):
+    #Returns the ambient temperature (deg F) in each of the Length timesteps of a simulation starting at midnight on Jan 1. Simulations longer
+    #than the weather file use its final temperature for the remaining timesteps
+    #Fraction_Outdoor = 1 represents a unit installed outdoors, 0 a unit installed in conditioned space at Temperature_Indoor, and values in
+    #between semi-conditioned spaces such as garages
+    Temperature_Outdoor = Load_Temperature_Outdoor(Path_Weather, Timestep)
+    Temperature_Outdoor = Temperature_Outdoor[np.minimum(np.arange(Length), len(Temperature_Outdoor) - 1)]
+    return Fraction_Outdoor * Temperature_Outdoor + (1 - Fraction_Outdoor) * Temperature_Indoor
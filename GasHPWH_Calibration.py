@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 14:20:00 2020
+
+This module calibrates the parameters of the gas HPWH model to GTI's field monitoring data using differential evolution, instead of tuning them
+by hand and rerunning GasHPWH_Model_MixedTank_Simulation_MonitoredData.py. The model and the measurements are compared in intervals of several
+hours, since the timing of individual heat pump cycles in the model never exactly matches the data.
+
+@author: Peter Grant
+"""
+
+import pandas as pd
+import numpy as np
+import time
+from collections import namedtuple
+import GasHPWH_Model as GasHPWH
+import GasHPWH_MonitoredData
+
+Names_Calibration = ['Coefficient_JacketLoss', 'Coefficient_COP', 'Constant_COP', 'ElectricityConsumption_Active', 'Temperature_Tank_Set_Deadband'] #The parameters fit by default
+Bounds_Default = {'Coefficient_JacketLoss': (0., 150.), #Btu/hr-F
+                  'Coefficient_COP': (-0.02, 0.02), #The coefficient in the COP equation
+                  'Constant_COP': (0., 4.), #The constant in the COP equation
+                  'ElectricityConsumption_Active': (0., 500.), #W
+                  'Temperature_Tank_Set_Deadband': (1., 60.)} #deg F
+
+Calibration_Data = namedtuple('Calibration_Data', ['Time', 'Timestep', 'Ambient', 'Inlet', 'Draw', 'Interval', 'Count', 'Measured', 'Valid', 'Scales'])
+Calibration_Result = namedtuple('Calibration_Result', ['Fitted', 'Parameters', 'Regression_COP', 'Residuals', 'Iterations'])
+
+def Prepare_Calibration_Data(Model, Draw_Profile, Length_Interval = 360):
+    #Returns the Calibration_Data for a data set: the mean measured tank temperature and the total measured gas (Btu) and electricity (W-h) use in
+    #each interval of Length_Interval minutes. Model is the model dataframe from GasHPWH_MonitoredData.Create_Model, and Draw_Profile the
+    #repaired measured data it was created from. If Model has no 'Timestep (min)' column each timestep lasts until the next measurement, and the
+    #final timestep matches the one before it
+    Time = Model['Time (min)'].to_numpy(dtype = float)
+    if 'Timestep (min)' in Model.columns:
+        Timestep = Model['Timestep (min)'].to_numpy(dtype = float)
+    else:
+        Timestep = np.diff(Time, append = 2 * Time[-1] - Time[-2])
+    Interval = np.floor(Time / Length_Interval).astype(np.int64)
+    Intervals = Interval[-1] + 1
+
+    Tank = Draw_Profile['Mid Tank'].to_numpy(dtype = float)
+    Gas = GasHPWH_MonitoredData.Btu_Per_CubicFoot_NaturalGas * Draw_Profile['Gas Meter'].diff().fillna(0).to_numpy(dtype = float) #Gas consumed in each timestep, in Btu
+    Electricity = Draw_Profile['Power Draw'].diff().fillna(0).to_numpy(dtype = float) #Electricity consumed in each timestep, in W-h
+    Count_Tank = np.bincount(Interval, weights = np.isfinite(Tank), minlength = Intervals)
+    Measured = np.column_stack([np.bincount(Interval, weights = np.nan_to_num(Tank), minlength = Intervals) / np.maximum(Count_Tank, 1), #Mean of the valid tank temperature measurements
+                                np.bincount(Interval, weights = Gas, minlength = Intervals),
+                                np.bincount(Interval, weights = Electricity, minlength = Intervals)])
+    Valid = Count_Tank > 0 #Intervals without any measurements, such as when the data logger was offline, are not compared
+    Scales = Measured[Valid].std(axis = 0)
+    Scales[Scales == 0] = 1
+
+    Arrays = [np.ascontiguousarray(Array) for Array in [Time, Timestep, Model['Ambient Temperature (deg F)'].to_numpy(dtype = float),
+              Model['Inlet Water Temperature (deg F)'].to_numpy(dtype = float), Model['Hot Water Draw Volume (gal)'].to_numpy(dtype = float), Interval]]
+    return Calibration_Data(*Arrays, np.bincount(Interval, minlength = Intervals), Measured, Valid, Scales)
+
+def Simulate_Intervals(Data, Parameters, Coefficients_COP, Temperature_Tank_Initial, Compiled = None):
+    #Simulates every candidate and returns a (candidates x intervals x 3) array of the mean tank temperature (deg F), gas use (Btu) and
+    #electricity use (W-h) in each interval. Parameters is a (candidates x 12) array in the order of GasHPWH_Parameters and Coefficients_COP a
+    #(candidates x coefficients) array of COP regression coefficients, both in the order used by np.poly1d
+    if Compiled is None:
+        Compiled = GasHPWH.Use_Compiled_Kernel
+    Parameters = np.ascontiguousarray(np.atleast_2d(Parameters), dtype = float)
+    Coefficients_COP = np.ascontiguousarray(np.broadcast_to(np.atleast_2d(np.asarray(Coefficients_COP, dtype = float)), (len(Parameters), np.shape(Coefficients_COP)[-1])))
+
+    #Each candidate is simulated by the kernel of GasHPWH_Model.Model_GasHPWH_MixedTank_Summary, adding its timesteps to their intervals instead of their hours
+    Kernel = GasHPWH._Kernel_GasHPWH_MixedTank_Summary_Compiled if Compiled and GasHPWH.Numba_Available else GasHPWH._Kernel_GasHPWH_MixedTank_Summary
+    Totals = np.zeros((len(Parameters), len(Data.Count), 3))
+    for k in range(len(Parameters)):
+        Totals_Candidate = np.zeros((len(Data.Count), 5))
+        Kernel(Data.Time, Data.Timestep, Data.Ambient, Data.Inlet, Data.Draw, Data.Interval, Totals_Candidate, Coefficients_COP[k], *Parameters[k],
+               float(Temperature_Tank_Initial), False)
+        Totals[k] = Totals_Candidate[:, [4, 1, 0]] #tank temperature, gas and electricity
+    Totals[:, :, 0] /= np.maximum(Data.Count, 1)
+    return Totals
+
+def Residuals(Data, Simulated):
+    #Returns the (candidates x residuals) array of scaled differences between the simulated and measured values in every valid interval, with the
+    #tank temperature, gas and electricity residuals for each candidate in that order. Each difference is divided by the standard deviation of
+    #its measurement, so the three have similar weights
+    Difference = (Simulated[:, Data.Valid, :] - Data.Measured[Data.Valid]) / Data.Scales
+    return Difference.transpose(0, 2, 1).reshape(len(Simulated), -1)
+
+def Calibrate(Model, Draw_Profile, Parameters, Regression_COP, Temperature_Tank_Initial, Names = Names_Calibration, Bounds = None, Length_Interval = 360,
+              Population = 10, Max_Iterations = 100, Tolerance = 0.01, Mutation = (0.5, 1.), Recombination = 0.7, Seed = None, Compiled = None, Verbose = True):
+    #Fits the parameters in Names to the measured data, starting from Parameters (A GasHPWH_Parameters or the positional parameter list) and
+    #Regression_COP. Names may be any of the first 12 fields of GasHPWH_Parameters, in its units, and the COP regression coefficients. Bounds is a dictionary of (lower, upper) bounds that replace those in Bounds_Default, and must include any parameter that
+    #isn't in Bounds_Default. The cost of a parameter set is half the sum of its squared residuals
+    #Population is the number of candidates per parameter being fit. Stops when the standard deviation of the costs of the candidates is less
+    #than Tolerance times their mean, or after Max_Iterations. Seed sets the random number generator, so a calibration can be repeated exactly
+    Bounds = dict(Bounds_Default, **({} if Bounds is None else Bounds))
+    Lower, Upper = np.array([Bounds[Name] for Name in Names], dtype = float).T
+    Parameters = GasHPWH.GasHPWH_Parameters(*Parameters)
+    Parameters_Initial = np.array(Parameters[0:12], dtype = float)
+    Coefficients_COP_Initial = np.asarray(Regression_COP.coeffs, dtype = float)
+    Coefficients_COP_Initial = np.concatenate([np.zeros(max(2 - len(Coefficients_COP_Initial), 0)), Coefficients_COP_Initial]) #A constant COP is treated as a line with a coefficient of 0
+    Data = Prepare_Calibration_Data(Model, Draw_Profile, Length_Interval)
+    Random = np.random.default_rng(Seed)
+
+    def Candidates(Scaled):
+        #Converts (candidates x names) values scaled to the bounds into parameter and COP coefficient arrays
+        Values = Lower + Scaled * (Upper - Lower)
+        Parameters_Candidates = np.tile(Parameters_Initial, (len(Values), 1))
+        Coefficients_COP = np.tile(Coefficients_COP_Initial, (len(Values), 1))
+        for j, Name in enumerate(Names):
+            if Name == 'Coefficient_COP':
+                Coefficients_COP[:, -2] = Values[:, j]
+            elif Name == 'Constant_COP':
+                Coefficients_COP[:, -1] = Values[:, j]
+            else:
+                Parameters_Candidates[:, GasHPWH.GasHPWH_Parameters._fields.index(Name)] = Values[:, j]
+        return Parameters_Candidates, Coefficients_COP
+
+    def Cost(Scaled):
+        return 0.5 * np.sum(Residuals(Data, Simulate_Intervals(Data, *Candidates(Scaled), Temperature_Tank_Initial, Compiled))**2, axis = 1)
+
+    #The first candidate is the starting point, and the others are spread uniformly between the bounds
+    Values_Initial = [Coefficients_COP_Initial[-2] if Name == 'Coefficient_COP' else Coefficients_COP_Initial[-1] if Name == 'Constant_COP'
+                      else Parameters_Initial[GasHPWH.GasHPWH_Parameters._fields.index(Name)] for Name in Names]
+    Size = Population * len(Names)
+    Scaled = Random.random((Size, len(Names)))
+    Scaled[0] = np.clip((np.array(Values_Initial, dtype = float) - Lower) / (Upper - Lower), 0, 1)
+    Start = time.time()
+    Costs = Cost(Scaled)
+    History = []
+
+    for Iteration in range(Max_Iterations + 1):
+        if Iteration > 0: #Differential evolution: each candidate is compared to another candidate moved by the scaled difference between two more
+            Start = time.time()
+            Others = np.argsort(Random.random((Size, Size - 1)), axis = 1)[:, 0:3] #Three different candidates for each candidate, from the Size - 1 others
+            Others += Others >= np.arange(Size)[:, np.newaxis]
+            Mutant = Scaled[Others[:, 0]] + Random.uniform(*Mutation) * (Scaled[Others[:, 1]] - Scaled[Others[:, 2]])
+            Crossover = Random.random((Size, len(Names))) < Recombination
+            Crossover[np.arange(Size), Random.integers(len(Names), size = Size)] = True #Every trial changes at least one value
+            Trial = np.where(Crossover, np.clip(Mutant, 0, 1), Scaled)
+            Costs_Trial = Cost(Trial)
+            Improved = Costs_Trial <= Costs
+            Scaled[Improved], Costs[Improved] = Trial[Improved], Costs_Trial[Improved]
+        Best = np.argmin(Costs)
+        History.append(dict(zip(Names, Lower + Scaled[Best] * (Upper - Lower)), Iteration = Iteration, Cost = Costs[Best], Candidates = Size, **{'Time (s)': time.time() - Start}))
+        if Verbose:
+            print('Iteration {0}: best cost {1:.6g}, {2} candidates simulated in {3:.3f} seconds'.format(Iteration, Costs[Best], Size, History[-1]['Time (s)']))
+        if np.std(Costs) <= Tolerance * np.mean(Costs):
+            break
+
+    Parameters_Fitted, Coefficients_COP_Fitted = Candidates(Scaled[Best][np.newaxis])
+    Fitted = pd.Series(Lower + Scaled[Best] * (Upper - Lower), index = Names)
+    Simulated = Simulate_Intervals(Data, Parameters_Fitted, Coefficients_COP_Fitted, Temperature_Tank_Initial, Compiled)[0]
+    Results = pd.DataFrame({'Time (min)': np.flatnonzero(Data.Valid) * float(Length_Interval)}) #Start of each interval
+    for j, (Name, Units) in enumerate([('Tank Temperature', 'deg F'), ('Gas', 'Btu'), ('Electricity', 'W-h')]):
+        Results['{0}, Data ({1})'.format(Name, Units)] = Data.Measured[Data.Valid, j]
+        Results['{0}, Model ({1})'.format(Name, Units)] = Simulated[Data.Valid, j]
+        Results['{0} Residual ({1})'.format(Name, Units)] = Simulated[Data.Valid, j] - Data.Measured[Data.Valid, j]
+    if Verbose:
+        print('Fitted values:\n' + Fitted.to_string())
+        print('RMS residuals: ' + ', '.join('{0} {1:.4g}'.format(Column, np.sqrt(np.mean(Results[Column]**2))) for Column in Results.columns if 'Residual' in Column))
+
+    Parameters_Fitted = Parameters._replace(**{Name: Parameters_Fitted[0, GasHPWH.GasHPWH_Parameters._fields.index(Name)] for Name in Names if Name in GasHPWH.GasHPWH_Parameters._fields})
+    return Calibration_Result(Fitted, Parameters_Fitted, np.poly1d(Coefficients_COP_Fitted[0]), Results, pd.DataFrame(History)[['Iteration', 'Cost', 'Candidates', 'Time (s)'] + list(Names)])
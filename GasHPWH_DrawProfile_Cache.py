@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 14 10:20:00 2020
+
+This module stores CBECC-Res draw profiles after they have been converted to timestep-based format, so they don't need to be read and binned
+again every time a simulation is run. The cache folder is limited to Max_Size_Cache bytes, deleting the least recently used files first.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import hashlib
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+
+Cache_Version = 1 #Increment when Bin_Draw_Profile changes, so old cache files are not used
+Folder_Cache = os.path.dirname(os.path.abspath(__file__)) + os.sep + 'Data' + os.sep + 'Cache' + os.sep + 'Draw_Profiles' #Default location of the cache files
+Max_Size_Cache = 2 * 1024 ** 3 #bytes, the least recently used cache files are deleted when the cache folder grows beyond this size. 2 GB holds all 80 CBECC-Res profiles at a 1 minute timestep
+
+Fields = [('Hot Water Draw Volume (gal)', 'f8'), ('Inlet Water Temperature (deg F)', 'f8'), ('Hour of Year (hr)', 'i8')] #dtype of the cached arrays
+
+def Key_Cache(Path_DrawProfile, Timestep):
+    #Returns the name of the cache file for Path_DrawProfile binned at Timestep, a hash of its path, modification time, contents, the timestep and
+    #Cache_Version so changes never return out of date data
+    Path_DrawProfile = os.path.abspath(Path_DrawProfile)
+    with open(Path_DrawProfile, 'rb') as File:
+        Hash_Contents = hashlib.sha1(File.read()).hexdigest()
+    Key = '{0}|{1}|{2}|{3!r}|{4}'.format(Path_DrawProfile, os.stat(Path_DrawProfile).st_mtime_ns, Hash_Contents, float(Timestep), Cache_Version)
+    return hashlib.sha1(Key.encode()).hexdigest() + '.npy'
+
+def Load_Binned_Draw_Profile(Path_DrawProfile, Timestep, Folder = None, Max_Size = None):
+    #Returns the binned version of the draw profile at Path_DrawProfile, reading it from the cache if possible and adding it to the cache if not
+    #The returned array is a read-only memory map. Copy it before modifying it
+    if Folder is None:
+        Folder = Folder_Cache
+    if Max_Size is None:
+        Max_Size = Max_Size_Cache
+
+    Path_Cache = Folder + os.sep + Key_Cache(Path_DrawProfile, Timestep)
+    if os.path.exists(Path_Cache):
+        os.utime(Path_Cache) #Mark the file as recently used
+        return np.load(Path_Cache, mmap_mode = 'r')
+
+    Volume, Inlet = GasHPWH_Support.Bin_Draw_Profile(pd.read_csv(Path_DrawProfile), Timestep)
+    Binned = np.zeros(len(Volume), dtype = Fields)
+    Binned['Hot Water Draw Volume (gal)'] = Volume
+    Binned['Inlet Water Temperature (deg F)'] = Inlet
+    Binned['Hour of Year (hr)'] = (np.arange(len(Volume)) * Timestep / 60).astype(int)
+
+    os.makedirs(Folder, exist_ok = True)
+    GasHPWH_Support.Write_Atomic(Path_Cache, lambda File: np.save(File, Binned))
+    Evict_Cache(Folder, Max_Size)
+    return np.load(Path_Cache, mmap_mode = 'r')
+
+def Evict_Cache(Folder = None, Max_Size = None):
+    #Deletes the least recently used cache files until the cache folder is no larger than Max_Size bytes
+    if Folder is None:
+        Folder = Folder_Cache
+    if Max_Size is None:
+        Max_Size = Max_Size_Cache
+    if not os.path.isdir(Folder):
+        return
+
+    Files = []
+    for Entry in os.scandir(Folder):
+        if Entry.name.endswith('.npy'):
+            Status = Entry.stat()
+            Files.append((Status.st_mtime, Status.st_size, Entry.path))
+    Size = sum(File[1] for File in Files)
+    for Time_Used, Size_File, Path in sorted(Files):
+        if Size <= Max_Size:
+            break
+        try:
+            os.remove(Path)
+        except OSError: #Another process already deleted it, or it's open on Windows. Either way it no longer needs to be counted
+            pass
+        Size -= Size_File
+
+def Clear_Cache(Folder = None):
+    #Deletes every cache file in the cache folder
+    Evict_Cache(Folder, 0)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 15 13:05:00 2020
+
+This module keeps a catalog of the CBECC-Res draw profiles available in a folder, so scripts don't need to list the folder and split every file
+name each time they run. The catalog is saved in the cache folder used by GasHPWH_DrawProfile_Cache, and only new or changed files are read.
+
+@author: Peter Grant
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import GasHPWH_DrawProfile_Cache
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+
+Path_Catalog_Default = os.path.dirname(GasHPWH_DrawProfile_Cache.Folder_Cache) + os.sep + 'Draw_Profile_Catalog.csv' #Default location of the saved catalog
+Fields_Name = ['Bldg', 'CZ', 'Wat', 'Prof', 'SDLM', 'CFA', 'Inc', 'Ver'] #The fields in each draw profile file name, in order
+Fields_Integer = ['CZ', 'Prof', 'CFA', 'Ver'] #Fields in the file name that are stored as integers
+Columns_Catalog = ['Path', 'File'] + Fields_Name + ['Days', 'Missing_Days', 'Total_Volume', 'Draws', 'Mtime', 'Size']
+
+def Parse_File_Name(File):
+    #Returns a dictionary of the fields in a draw profile file name, or None if the name doesn't match the expected format
+    Pairs = [Field.split('=') for Field in File[:-len('.csv')].split('_')]
+    if [Pair[0] for Pair in Pairs] != Fields_Name or any(len(Pair) != 2 for Pair in Pairs):
+        return None
+    Fields = dict(Pairs)
+    try:
+        for Field in Fields_Integer:
+            Fields[Field] = int(Fields[Field])
+    except ValueError:
+        return None
+    return Fields
+
+def Catalog_Draw_Profile(Path):
+    #Returns a dictionary of the statistics describing the draw profile at Path
+    Draw_Profile = pd.read_csv(Path, usecols = ['Day of Year (Day)', 'Hot Water Flow Rate (gpm)', 'Duration (min)'])
+    Day = Draw_Profile['Day of Year (Day)'].to_numpy().astype(int)
+    Days = int(Day.max() - Day.min() + 1) if len(Day) > 0 else 0
+    return {'Days': Days,
+            'Missing_Days': Days - len(np.unique(Day)),
+            'Total_Volume': float((Draw_Profile['Hot Water Flow Rate (gpm)'] * Draw_Profile['Duration (min)']).sum()),
+            'Draws': len(Draw_Profile)}
+
+def Update_Catalog(Folder, Path_Catalog = None):
+    #Returns the catalog of every draw profile in Folder, sorted by file name. Files that were added or changed since the catalog was last saved
+    #are read and cataloged, and files that no longer exist are removed. Files whose names don't match the format are skipped with a warning
+    #Each row holds Path, File, the fields of the file name (Bldg, CZ, Wat, Prof, SDLM, CFA, Inc and Ver), Mtime, Size and the statistics from
+    #Catalog_Draw_Profile: Days (First to last day), Missing_Days (Days without draws), Total_Volume (gal) and Draws
+    if Path_Catalog is None:
+        Path_Catalog = Path_Catalog_Default
+    Folder = os.path.abspath(Folder)
+
+    if os.path.exists(Path_Catalog):
+        Catalog = pd.read_csv(Path_Catalog, keep_default_na = False)
+    else:
+        Catalog = pd.DataFrame(columns = Columns_Catalog)
+    In_Folder = Catalog['Path'].map(os.path.dirname) == Folder
+    Catalog_Other = Catalog[~In_Folder] #Catalogs of other folders are kept as they are
+    Catalog_Saved = Catalog[In_Folder].set_index('Path', drop = False)
+
+    Rows, Changed = [], False
+    for Entry in sorted(os.scandir(Folder), key = lambda Entry: Entry.name):
+        if not Entry.name.endswith('.csv'):
+            continue
+        Fields = Parse_File_Name(Entry.name)
+        if Fields is None:
+            print("skipping {0}, draw profile file names should be formatted as 'Bldg=[Building Type]_CZ=[Climate Zone]_Wat=[Hot]_Prof=[Profile Number]_SDLM=[Yes/No]_CFA=[Floor Area]_Inc=[Included Draw Types]_Ver=[Source_Data_Year].csv'".format(Entry.name))
+            continue
+        Status = Entry.stat()
+        if Entry.path in Catalog_Saved.index:
+            Row = Catalog_Saved.loc[Entry.path]
+            if Row['Mtime'] == Status.st_mtime_ns and Row['Size'] == Status.st_size: #The file hasn't changed, so the saved statistics are still correct
+                Rows.append(Row.to_dict())
+                continue
+        Row = {'Path': Entry.path, 'File': Entry.name, 'Mtime': Status.st_mtime_ns, 'Size': Status.st_size}
+        Row.update(Fields)
+        Row.update(Catalog_Draw_Profile(Entry.path))
+        Rows.append(Row)
+        Changed = True
+
+    Catalog_Folder = pd.DataFrame(Rows, columns = Columns_Catalog)
+    if Changed or len(Catalog_Folder) != len(Catalog_Saved):
+        os.makedirs(os.path.dirname(Path_Catalog), exist_ok = True)
+        GasHPWH_Support.Write_Atomic(Path_Catalog, lambda File: pd.concat([Catalog_Other, Catalog_Folder]).to_csv(File, index = False))
+
+    Catalog_Folder = Catalog_Folder.astype({Field: int for Field in Fields_Integer + ['Days', 'Missing_Days', 'Draws', 'Mtime', 'Size']})
+    return Catalog_Folder.astype({'Total_Volume': float})
+
+def Query(Catalog, Expression = None, **Values):
+    #Returns the rows of Catalog matching every condition. Each keyword argument selects rows where that column equals the value, or any value
+    #in a list of values. Expression is a pandas query string, such as 'CFA >= 2100 and Missing_Days == 0'
+    Selected = Catalog
+    for Column, Value in Values.items():
+        if isinstance(Value, (list, tuple, set, np.ndarray, pd.Series)):
+            Selected = Selected[Selected[Column].isin(list(Value))]
+        else:
+            Selected = Selected[Selected[Column] == Value]
+    if Expression is not None:
+        Selected = Selected.query(Expression)
+    return Selected
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 28 09:30:00 2020
+
+This module keeps a journal of the simulations completed by a batch run, so a run that crashes or is stopped partway through doesn't lose the
+simulations it already finished. GasHPWH_Sweep.Run_Draw_Profiles and Run_Sweep use it when given a Path_Journal.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import json
+import hashlib
+import GasHPWH_RunCache
+
+def Key_Job(*Values):
+    #Returns a hash of Values identifying a job. Values may be None, numbers, strings, arrays, series, dataframes, np.poly1d or anything with a
+    #Hash method (Such as GasHPWH_Parameters)
+    Hash = hashlib.sha1()
+    for Value in Values:
+        if hasattr(Value, 'Hash'):
+            Value = Value.Hash()
+        elif isinstance(Value, np.poly1d):
+            Value = Value.coeffs
+        if isinstance(Value, pd.DataFrame):
+            Hash.update(repr(list(Value.columns)).encode())
+        if isinstance(Value, (np.ndarray, pd.Series, pd.DataFrame)):
+            Value = GasHPWH_RunCache.Hash_Arrays(np.asarray(Value, dtype = float))
+        Hash.update('{0!r}|'.format(Value).encode())
+    return Hash.hexdigest()
+
+def _Encode(Value):
+    #Converts the values json can't save. Dataframes are saved as a dictionary of lists, one per column
+    if isinstance(Value, pd.DataFrame):
+        return Value.to_dict('list')
+    if isinstance(Value, (np.ndarray, pd.Series)):
+        return Value.tolist()
+    if isinstance(Value, np.generic):
+        return Value.item()
+    raise TypeError('{0} can not be saved in the journal'.format(type(Value).__name__))
+
+def Open_Journal(Path):
+    #Returns a dictionary of the results already in the journal at Path, keyed by the key of each job, and the journal opened to append new
+    #results. The journal is created if it doesn't exist, and an incomplete last line is removed
+    Results = {}
+    End = 0 #Position of the end of the last complete line
+    if os.path.exists(Path):
+        with open(Path, 'rb') as File:
+            for Line in File:
+                if not Line.endswith(b'\n'): #Only partly written when the run was stopped
+                    break
+                End += len(Line)
+                try:
+                    Entry = json.loads(Line)
+                except ValueError: #Damaged when the computer lost power, so the job is run again
+                    continue
+                Results[Entry['Key']] = Entry['Result']
+        File = open(Path, 'r+b')
+        File.truncate(End)
+        File.seek(End)
+    else:
+        File = open(Path, 'wb')
+    return Results, File
+
+def Append(File, Key, Result):
+    #Writes the results of a job to the journal File returned by Open_Journal, and waits until they're saved on the disk
+    File.write((json.dumps({'Key': Key, 'Result': Result}, default = _Encode) + '\n').encode())
+    File.flush()
+    os.fsync(File.fileno())
+
+def Progress(Finished, Remaining, Elapsed):
+    #Returns a description of the progress of a run that finished Finished jobs in Elapsed seconds, with Remaining jobs still to run
+    if Finished == 0 or Elapsed <= 0:
+        return '{0} remaining'.format(Remaining)
+    Rate = Finished / Elapsed
+    return '{0:.2f} per second, about {1} remaining'.format(Rate, Format_Duration(Remaining / Rate))
+
+def Format_Duration(Seconds):
+    #Returns a duration as hours, minutes and seconds, such as 1:02:03
+    Minutes, Seconds = divmod(int(round(Seconds)), 60)
+    Hours, Minutes = divmod(Minutes, 60)
+    return '{0}:{1:02d}:{2:02d}'.format(Hours, Minutes, Seconds)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 12 09:15:00 2020
+
+This script benchmarks the two ways of performing the timestep calculations in GasHPWH_Model.Model_GasHPWH_MixedTank. It runs every CBECC-Res
+draw profile in Data/Draw_Profiles through the model once using the original Python loop and once using the compiled kernel, confirms that both
+return the same results, and prints the time required by each.
+
+The draw profiles are converted to timestep-based format before any timing starts, so the reported times only cover the model itself. The
+first call to the compiled kernel includes the time needed to compile it (Or load it from numba's cache), so that call is timed separately and
+excluded from the comparison.
+
+The compiled kernel in Model_GasHPWH_MixedTank also builds a dataframe with every timestep, so the fastest fixed-step model is the compiled
+GasHPWH_Model.Model_GasHPWH_MixedTank_Summary, which only returns the totals. It is timed for each profile too, and the other two models are
+compared to it.
+
+The compiled Summary model is also timed with Skip_Idle = True, which skips through the idle periods between draws, and its annual totals are
+compared to those calculated without skipping.
+
+The stratified tank model (GasHPWH_Model.Model_GasHPWH_StratifiedTank) is timed at Nodes_Stratified nodes and compared to the compiled Summary
+model, showing the cost of representing stratification. Its annual totals differ from the mixed tank's by design, so they aren't compared.
+
+Timestep = 1 is the worst case for the Python loop (525,600 timesteps per profile). Running all 80 profiles with the Python loop at that
+resolution takes a long time, so runs_limit can be used to benchmark a subset.
+
+@author: Peter Grant
+"""
+
+#%%--------------------------IMPORT STATEMENTS--------------------------------
+
+import pandas as pd
+import numpy as np
+import os
+import sys
+import time
+import GasHPWH_Model as GasHPWH
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+
+#%%--------------------------USER INPUTS------------------------------------------
+
+Timestep = 1 #Timestep to use in the draw profile and simulation, in minutes
+runs_limit = None #enter None to benchmark every profile, or a number to only benchmark that many profiles
+Nodes_Stratified = 12 #Number of nodes used when timing the stratified tank model
+
+Path_DrawProfile_Base_Path = os.path.dirname(__file__) + os.sep + 'Data' + os.sep + 'Draw_Profiles'
+
+#%%--------------------------GAS HPWH PARAMETERS------------------------------
+
+#Default parameters from GasHPWH_Model_MixedTank_Simulation_MultipleDraws.py
+Temperature_Tank_Initial = 115 #Deg F
+Regression_COP = np.poly1d([-0.0025, 2.0341]) #COP of the heat pump as a function of the temperature of water in the tank
+Parameters = GasHPWH.GasHPWH_Parameters.From_Inputs(Temperature_Tank_Set = 115,
+                Temperature_Tank_Set_Deadband = 10,
+                Volume_Tank = 65,
+                Coefficient_JacketLoss = 2.638,
+                Power_Backup = 1250,
+                Threshold_Activation_Backup = 95,
+                Threshold_Deactivation_Backup = 105,
+                FiringRate_HeatPump = 2930.72,
+                ElectricityConsumption_Active = 110,
+                ElectricityConsumption_Idle = 5,
+                NOx_Output = 10,
+                CO2_Output_Gas = 0.0053,
+                CO2_Output_Electricity = 0.212115)
+
+#%%--------------------------FUNCTIONS-----------------------------------------
+
+def Create_Model(Path_DrawProfile):
+    #Converts a CBECC-Res draw profile to the timestep-based dataframe used by the model, matching the logic in the simulation scripts
+    Draw_Profile = pd.read_csv(Path_DrawProfile)
+    Volume, Inlet = GasHPWH_Support.Bin_Draw_Profile(Draw_Profile, Timestep)
+
+    Model = pd.DataFrame(index = range(len(Volume)))
+    Model['Time (min)'] = Model.index * Timestep
+    Model['Hot Water Draw Volume (gal)'] = Volume
+    Model['Inlet Water Temperature (deg F)'] = Inlet
+    Model['Ambient Temperature (deg F)'] = 68
+    Model['Tank Temperature (deg F)'] = 0
+    Model.loc[0:1, 'Tank Temperature (deg F)'] = Temperature_Tank_Initial
+    for Column in ['Jacket Losses (Btu)', 'Energy Withdrawn (Btu)', 'Energy Added Backup (Btu)', 'Energy Added Heat Pump (Btu)', 'Energy Added Total (Btu)',
+                   'COP Gas', 'Total Energy Change (Btu)', 'CO2 Production (lb)', 'Electricity CO2 Multiplier (lb/kWh)']:
+        Model[Column] = 0.
+    Model['Timestep (min)'] = Timestep
+    Model['Hour of Year (hr)'] = (Model['Time (min)']/60).astype(int)
+    return Model
+
+#%%--------------------------BENCHMARK-----------------------------------------
+
+if not GasHPWH.Numba_Available:
+    print('numba is not installed, so the compiled kernel is not available to benchmark')
+    sys.exit()
+
+Files = sorted(file for file in os.listdir(Path_DrawProfile_Base_Path) if file.endswith('.csv'))
+if runs_limit != None:
+    Files = Files[:runs_limit]
+
+Start = time.time()
+Models = [Create_Model(Path_DrawProfile_Base_Path + os.sep + file) for file in Files]
+print('converted {0} draw profiles at a {1} minute timestep in {2:.2f} seconds'.format(len(Models), Timestep, time.time() - Start))
+
+Start = time.time()
+GasHPWH.Model_GasHPWH_MixedTank(Models[0], Parameters, Regression_COP, Compiled = True)
+print('first call to the compiled kernel (Including compilation) took {0:.2f} seconds'.format(time.time() - Start))
+
+Start = time.time()
+GasHPWH.Model_GasHPWH_MixedTank_Summary(Models[0]['Hot Water Draw Volume (gal)'], Models[0]['Inlet Water Temperature (deg F)'], 68, Models[0]['Time (min)'],
+                                        Timestep, Parameters, Regression_COP, Temperature_Tank_Initial, Hour = Models[0]['Hour of Year (hr)'], Compiled = True)
+print('first call to the compiled Summary model (Including compilation) took {0:.2f} seconds'.format(time.time() - Start))
+
+Start = time.time()
+GasHPWH.Model_GasHPWH_StratifiedTank(Models[0]['Hot Water Draw Volume (gal)'], Models[0]['Inlet Water Temperature (deg F)'], 68, Models[0]['Time (min)'],
+                                     Timestep, Parameters, Regression_COP, Temperature_Tank_Initial, Nodes = Nodes_Stratified, Compiled = True)
+print('first call to the stratified tank model (Including compilation) took {0:.2f} seconds'.format(time.time() - Start))
+
+Time_Python, Time_Compiled, Time_Summary, Time_Skip_Idle, Time_Stratified, Max_Difference, Max_Difference_Skip_Idle = 0, 0, 0, 0, 0, 0, 0
+for file, Model in zip(Files, Models):
+    Start = time.time()
+    Result_Python = GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP, Compiled = False)
+    Middle = time.time()
+    Result_Compiled = GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP, Compiled = True)
+    End = time.time()
+    Totals_Summary = GasHPWH.Model_GasHPWH_MixedTank_Summary(Model['Hot Water Draw Volume (gal)'], Model['Inlet Water Temperature (deg F)'], 68, Model['Time (min)'],
+                                                             Timestep, Parameters, Regression_COP, Temperature_Tank_Initial, Hour = Model['Hour of Year (hr)'],
+                                                             Compiled = True).Annual
+    End_Summary = time.time()
+    Totals_Skip_Idle = GasHPWH.Model_GasHPWH_MixedTank_Summary(Model['Hot Water Draw Volume (gal)'], Model['Inlet Water Temperature (deg F)'], 68, Model['Time (min)'],
+                                                               Timestep, Parameters, Regression_COP, Temperature_Tank_Initial, Hour = Model['Hour of Year (hr)'],
+                                                               Compiled = True, Skip_Idle = True).Annual
+    End_Skip_Idle = time.time()
+    GasHPWH.Model_GasHPWH_StratifiedTank(Model['Hot Water Draw Volume (gal)'], Model['Inlet Water Temperature (deg F)'], 68, Model['Time (min)'],
+                                         Timestep, Parameters, Regression_COP, Temperature_Tank_Initial, Hour = Model['Hour of Year (hr)'], Nodes = Nodes_Stratified, Compiled = True)
+    End_Stratified = time.time()
+    Time_Python += Middle - Start
+    Time_Compiled += End - Middle
+    Time_Summary += End_Summary - End
+    Time_Skip_Idle += End_Skip_Idle - End_Summary
+    Time_Stratified += End_Stratified - End_Skip_Idle
+    Max_Difference = max(Max_Difference, np.abs(Result_Python.to_numpy(dtype = float) - Result_Compiled.to_numpy(dtype = float)).max())
+    Max_Difference_Skip_Idle = max(Max_Difference_Skip_Idle, ((Totals_Skip_Idle - Totals_Summary) / Totals_Summary).abs().max())
+    print('{0}: Python loop {1:.3f} s, compiled kernel {2:.3f} s, compiled Summary {3:.3f} s, skipping idle timesteps {4:.3f} s, stratified {5:.3f} s'.format(file,
+          Middle - Start, End - Middle, End_Summary - End, End_Skip_Idle - End_Summary, End_Stratified - End_Skip_Idle))
+
+print('Python loop total: {0:.2f} seconds'.format(Time_Python))
+print('Compiled kernel total: {0:.2f} seconds'.format(Time_Compiled))
+print('Speedup: {0:.1f}x'.format(Time_Python / Time_Compiled))
+print('Largest difference between the two results: {0}'.format(Max_Difference))
+print('Compiled Summary model total: {0:.2f} seconds'.format(Time_Summary))
+print('Compiled Summary model skipping idle timesteps total: {0:.2f} seconds ({1:.1f}x speedup)'.format(Time_Skip_Idle, Time_Summary / Time_Skip_Idle))
+print('Largest relative difference between the annual totals with and without skipping idle timesteps: {0:.2e}'.format(Max_Difference_Skip_Idle))
+print('Stratified tank total at {0} nodes: {1:.2f} seconds ({2:.1f}x the time of the compiled Summary model)'.format(Nodes_Stratified, Time_Stratified, Time_Stratified / Time_Summary))
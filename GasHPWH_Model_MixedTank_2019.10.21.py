@@ -30,7 +30,9 @@ from bokeh.plotting import figure, output_file, save, gridplot
 from bokeh.models import LassoSelectTool, WheelZoomTool, BoxZoomTool, ResetTool
 import os
 import time
-from linetimer import CodeTimer
+from functools import partial
+import GasHPWH_MonitoredData
+import GasHPWH_Plotting
 
 #%%--------------------------INPUTS-------------------------------------------
 
@@ -61,6 +63,12 @@ else:
 #calculations to take much longer
 Compare_To_MeasuredData = 1
 
+#The validation plots draw the lowest and highest value of each series in Points_Plot time buckets instead of every measurement, so they stay
+#small and fast for any length of data. Set Write_Tiles_Plot = 1 to also write zoom level tiles that show more detail when zooming in. The
+#tiles are only loaded when the plots are opened through a web server, such as python -m http.server in the Validation Data folder
+Points_Plot = 1600
+Write_Tiles_Plot = 0
+
 #These inputs are a series of constants describing the conditions of the simulation. Many of them are overwritten with measurements
 #if Compare_To_MeasuredData = 1. The constants describing the gas HPWH itself come from communications with Alex of GTI, and may
 #need to be updated if he sends new values
@@ -90,8 +98,6 @@ Minutes_In_Hour = 60 #The number of minutes in an hour
 Seconds_In_Minute = 60 #The number of seconds in a minute
 W_To_BtuPerHour = 3.412142 #Converting from Watts to Btu/hr
 K_To_F_MagnitudeOnly = 1.8/1. #Converting from K/C to F. Only applicable for magnitudes, not actual temperatures (E.g. Yes for "A temperature difference of 10 C" but not for "The water temperature is 40 C")
-Btu_Per_CubicFoot_NaturalGas = 1015 #Energy density of natural gas, in Btu/ft^3
-Btu_Per_WattHour = 3.412142 #Conversion factor between Btu nad W-h
 
 #Calculating the NOx production rate of the HPWH when HP is active
 NOx_Production_Rate = NOx_Output * FiringRate_HeatPump * Seconds_In_Minute
@@ -157,48 +163,10 @@ elif Type_DrawProfile == 'GTI_Field': #Performs this code if the draw profile da
 
     Start_ProfileCreation = time.time()
 
-    Draw_Profile = pd.read_csv(Path_DrawProfile, header = 1) #Reads the input data, setting the first row (measurement name) of the .csv file as the header
-    Draw_Profile = Draw_Profile.drop([0]) #Deletes the row of the data frame stating the units of each column, as that would cause errors in the calculations
-    Draw_Profile = Draw_Profile.reset_index() #Resets the index now that the first row has been removed
-    del Draw_Profile['index'] #Deletes the silly little column named 'index' that gets created when resetting hte index
-    Model = pd.DataFrame(index = Draw_Profile.index) #Creates a new data frame with the same index as the measured data
-    Draw_Profile['ELAPSED TIME'] = Draw_Profile['ELAPSED TIME'].astype(float) #Converts string data to float so the numbers can be used in calculations
-    Draw_Profile['Water Flow'] = Draw_Profile['Water Flow'].astype(float) #Converts string data to float so the numbers can be used in calculations
-    Draw_Profile['TIME'] = pd.to_datetime(Draw_Profile['TIME']) #Converts string data to time data so the numbers can be used in calculations
-    Draw_Profile['Gas Meter'] = Draw_Profile['Gas Meter'].astype(float) #Converts string data to float so the numbers can be used in calculations
-    Draw_Profile['Power Draw'] = Draw_Profile['Power Draw'].astype(float) #Converts string data to float so the numbers can be used in calculations
-    Draw_Profile['Mid Tank'] = Draw_Profile['Mid Tank'].astype(float) #Converts string data to float so the numbers can be used in calculations
-
-    #Model.to_csv(r'C:\Users\jpereira.FE\OneDrive - Frontier Energy, Inc\Desktop\Temp Model Runs\JP Sample\RevisedCBECCDrawProfile.csv', index = False)
-
-    values = {'Water Flow': 0} #These two lines set all "nan" entries in Water Flow to 0. This is needed to avoid errors when the data logger resets
-    Draw_Profile = Draw_Profile.fillna(value = values)
-
-    if Draw_Profile['ELAPSED TIME'].min() == 0.0: #ELAPSED TIME = 0 when the data logger resets. This code only executes if the data logger reset during the monitoring perio
-        Index_Reset = Draw_Profile.loc[Draw_Profile['ELAPSED TIME'] == 0.0].index.item() #Identifies the row in the table when the data logger reset
-        for i in range(Index_Reset, len(Draw_Profile.index)): #This for loop updates all entries after the data logger reset with new values, as if the data logger had not resest
-            Draw_Profile.loc[i, 'ELAPSED TIME'] = Draw_Profile.loc[i-1, 'ELAPSED TIME'] + (Draw_Profile.loc[i, 'TIME'] - Draw_Profile.loc[i - 1, 'TIME']).seconds #Calculates the actual time since the monitoring data started by adding the time delta to the previous value
-            if i == Index_Reset: #Execute this code only for the row that matches the time the datalogger reset
-                Delta_Next = Draw_Profile.loc[i + 1, 'Water Flow'] #Identfy the cumulative water flow as of the next entry
-                Draw_Profile.loc[i, 'Water Flow'] = Draw_Profile.loc[i-1, 'Water Flow'] #Sets the water flow in this row equal to the water flow in the previous row
-            else: #If it's an index other than the one where the dataloffer reset
-                Delta = Delta_Next #Update the delta value with the previously recorded delta_next value. This will be used to identify the amount of cumulative water flow as of the end of this timestep
-                if i < len(Draw_Profile.index) - 1: #Only do this if it's NOT the last row in the model. Because doing that would cause errors. The computer would overheat, which would ignite the oils on the keyboard from typing, which would burn the air in the office and kill everybody. Then you'd have to file a safety incident report. Sad face :-(
-                    Delta_Next = Draw_Profile.loc[i + 1, 'Water Flow'] - Draw_Profile.loc[i, 'Water Flow'] #Identify the increase in cumulative water flow between the current timestep and the next one
-                Draw_Profile.loc[i, 'Water Flow'] = Draw_Profile.loc[i - 1, 'Water Flow'] + Delta #Set the cumulative water flow of this timestep equal to the cumulative water flow of the previous timestep + the previously identified delta
-
-    Model['Time (min)'] = (Draw_Profile['ELAPSED TIME'] - Draw_Profile.loc[0, 'ELAPSED TIME'])/60. #Calculate the elapsed time in minutes, instead of seconds, and add it to the
-    Model['Water Flow'] = Draw_Profile['Water Flow'] #Adds a column to Model containing the water flow information from the measured data
+    Draw_Profile = GasHPWH_MonitoredData.Read_Monitored_Data(Path_DrawProfile) #Reads the input data, skipping the row stating the units of each column and converting the measurements to numbers
+    Draw_Profile = GasHPWH_MonitoredData.Repair_Resets(Draw_Profile) #Updates ELAPSED TIME and the cumulative counters after every data logger reset, as if the data logger had not reset
+    Model = GasHPWH_MonitoredData.Create_Model(Draw_Profile) #Creates the model dataframe, including the hot water draw volume in each timestep
     Temperature_Tank_Initial = float(Draw_Profile.loc[0, 'Mid Tank']) #Sets the initial temperature of the modeled tank equal to the initial measured temperature
-    Model['Hot Water Draw Volume (gal)'] = 0 #Sets the draw volume during the first timestep in the model to 0. Will be overwritten later if needed
-    for i in Draw_Profile.index: #This section calculates the hot water flow during each timestep and adds it to the modeling dataframe
-        if i > 0: #This code references the previous timestep, so don't do it on the first timestep. Because that's a terrible idea
-            Model.loc[i, 'Hot Water Draw Volume (gal)'] = Draw_Profile.loc[i, 'Water Flow'] - Draw_Profile.loc[i-1, 'Water Flow'] #Find the delta between the cumulative water flow identified in the current and previous timesteps, then enter that value in the current row
-        elif i == 0: #For the very first row
-            Model.loc[i, 'Hot Water Draw Volume (gal)'] = 0 #Set it equal to 0. Because there's no previous timestep to calculate from
-
-    Model['Ambient Temperature (deg F)'] = Draw_Profile['Indoor Temp'].astype(float) #Converts data frm string to float so it can be used in calculations
-    Model['Inlet Water Temperature (deg F)'] = Draw_Profile['Water In Temp'].astype(float) #Converts data frm string to float so it can be used in calculations
 
     End_ProfileCreation = time.time()
 
@@ -259,82 +227,66 @@ Model.to_csv(os.path.dirname(__file__) + os.sep + 'Output' + os.sep + 'Output.cs
 
 #This code is only run when comparing the model results to field measurements. It is typically used for model validation
 if Compare_To_MeasuredData == 1 and Type_DrawProfile == 'GTI_Field':
-    Compare_To_MeasuredData = Model.copy() #Creates a new dataframe specifically for comparing model results to measured data. Starts with the same index and data as the model results, then adds data and calculations from the measured data as necessary
-
-    Compare_To_MeasuredData['Hot Water Draw Volume, Model (gal)'] = Compare_To_MeasuredData['Hot Water Draw Volume (gal)'].cumsum() #Creates a new column in the data frame that cumulatively sums the hot water draw volume in the simulation model. This is then compared to the measured data to ensure that the two are the same
-    Compare_To_MeasuredData['Cumulative Hot Water Draw Volume, Data (gal)'] = Draw_Profile['Water Flow'] - Draw_Profile.loc[0, 'Water Flow'] #Creates a new column that represents the cumulative hot water draw volume in the data. The data does not start at 0 gal, so this column subtracts the first value from all values in the column to treat it as if it did start at 0
-    Compare_To_MeasuredData['Ambient Temperature, Data (deg F)'] = Draw_Profile['Indoor Temp'] #Creates a new column in the datframe storing the ambient temperature from the measured data
-    Compare_To_MeasuredData['Inlet Water Temperature, Data (deg F)'] = Draw_Profile['Water In Temp'] #Creates a new column in the data frame representing the measured inlet water temperature
-    Compare_To_MeasuredData['Tank Temperature, Data (deg F)'] = Draw_Profile['Mid Tank'] #Creates a new column in the data frame representing the measured temperature at the middle height of the tank
-    Compare_To_MeasuredData['COP, Data'] = Regression_COP(Draw_Profile['Mid Tank']) #Creates a new column in the data frame calculating the COP of the HPWH based on the measured tank water temperature
-
-    Compare_To_MeasuredData['Energy Added, Data (Btu)'] = 0 #Creates a new column for energy added in each timestep with a default value of 0. This value will later be overwritten when the correct value for each timestep is calculated
-    Compare_To_MeasuredData['Gas Consumption (Btu)'] = 0 #Creates a new column for gas consumption in each timestep with a default value of 0. This value will later be overwritten when the correct value for each timestep is calculated
-    Compare_To_MeasuredData['Energy Added Heat Pump, Model (Btu)'] = Model['Energy Added Heat Pump (Btu)']
-
-    for i in range(1, len(Compare_To_MeasuredData)):
-        Compare_To_MeasuredData.loc[i, 'Energy Added, Data (Btu)'] = Btu_Per_CubicFoot_NaturalGas * Compare_To_MeasuredData.loc[i, 'COP, Data'] * (Draw_Profile.loc[i, 'Gas Meter'] - Draw_Profile.loc[i-1, 'Gas Meter']) + Btu_Per_WattHour * (Draw_Profile.loc[i, 'Power Draw'] - Draw_Profile.loc[i-1, 'Power Draw']) #Calculates the energy added to the water during each timestep in the measured data
-        Compare_To_MeasuredData.loc[i, 'Energy Added Heat Pump, Data (Btu)'] = Btu_Per_CubicFoot_NaturalGas * Compare_To_MeasuredData.loc[i, 'COP, Data'] * (Draw_Profile.loc[i, 'Gas Meter'] - Draw_Profile.loc[i-1, 'Gas Meter']) #Calculates the energy added to the water by the heat pump during each time step in the measured data
-        Compare_To_MeasuredData.loc[i, 'Energy Added Heat Pump, Data (Btu/min)'] = Btu_Per_CubicFoot_NaturalGas * Compare_To_MeasuredData.loc[i, 'COP, Data'] * (Draw_Profile.loc[i, 'Gas Meter'] - Draw_Profile.loc[i-1, 'Gas Meter']) / (Compare_To_MeasuredData.loc[i, 'Time (min)'] - Compare_To_MeasuredData.loc[i-1, 'Time (min)']) #Calculates the rate of energy added to the heat pump during each timestep in the measured data
-        #Compare_To_MeasuredData.loc[i, 'Energy Added Heat Pump, Model (Btu)'] = FiringRate_HeatPump * Regression_COP(Compare_To_MeasuredData.loc[i, 'Tank Temperature (deg F)']) * int(Compare_To_MeasuredData.loc[i, 'Tank Temperature (deg F)'] < (Temperature_Tank_Set - Temperature_Tank_Set_Deadband) or Compare_To_MeasuredData.loc[i-1, 'Energy Added Heat Pump (Btu)'] > 0 and Compare_To_MeasuredData.loc[i, 'Tank Temperature (deg F)'] < Temperature_Tank_Set) * (Compare_To_MeasuredData.loc[i, 'Time (min)'] - Compare_To_MeasuredData.loc[i-1, 'Time (min)']) / Minutes_In_Hour #Calculates the energy added by the heat pump during each time step in the model
-        #Compare_To_MeasuredData.loc[i, 'Energy Added Heat Pump, Model (Btu/min)'] = FiringRate_HeatPump * Regression_COP(Compare_To_MeasuredData.loc[i, 'Tank Temperature (deg F)']) * int(Compare_To_MeasuredData.loc[i, 'Tank Temperature (deg F)'] < (Temperature_Tank_Set - Temperature_Tank_Set_Deadband) or Compare_To_MeasuredData.loc[i-1, 'Energy Added Heat Pump (Btu)'] > 0 and Compare_To_MeasuredData.loc[i, 'Tank Temperature (deg F)'] < Temperature_Tank_Set) / Minutes_In_Hour #Calculates the rate at which energy is added by the heat pump during each timestep according to the model
-        Compare_To_MeasuredData.loc[i, 'Timestep (min)'] = Compare_To_MeasuredData.loc[i, 'Time (min)'] - Compare_To_MeasuredData.loc[i-1, 'Time (min)']
-        Model.loc[i, 'Timestep (min)'] = Model.loc[i, 'Time (min)'] - Model.loc[i-1, 'Time (min)']
-
-        #Compare_To_MeasuredData['Energy Added Heat Pump, Model (Btu/min)'] = Model['Energy Added Heat Pump (Btu)'] / (Compare_To_MeasuredData.loc[i, 'Time (min)'] - Compare_To_MeasuredData.loc[i-1, 'Time (min)'])
+    #Calculates the measured energy added to the water and COP in every timestep, and the percent errors in the model's gas use, COP and electricity use
+    Compare_To_MeasuredData, Errors = GasHPWH_MonitoredData.Compare_To_MeasuredData(Model, Draw_Profile, Regression_COP)
+    Model['Timestep (min)'] = Compare_To_MeasuredData['Timestep (min)'] #Time between each measurement and the previous one, plotted below
 
     #Generates a series of plots that can be used for comparing the model results to the measured data
 
     tools = [LassoSelectTool(), WheelZoomTool(), BoxZoomTool(), ResetTool()]
 
+    #Each series is downsampled before plotting so the file stays small for long data sets, optionally writing zoom level tiles next to the plots
+    Folder_Tiles = os.path.dirname(__file__) + os.sep + 'Validation Data' + os.sep + 'Validation_Plots_Tiles' if Write_Tiles_Plot == 1 else None
+    Plot = partial(GasHPWH_Plotting.Plot_Series, Points = Points_Plot, Folder_Tiles = Folder_Tiles)
+
     p1 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Cumulative Hot Water Draw Volume (gal)', tools = tools)
     p1.title.text_font_size = '12pt'
-    p1.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Hot Water Draw Volume, Model (gal)'], legend = 'Model', color = 'red')
-    p1.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Cumulative Hot Water Draw Volume, Data (gal)'], legend = 'Data', color = 'blue')
+    Plot(p1, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Hot Water Draw Volume, Model (gal)'], 'line', 'p1_Model', legend = 'Model', color = 'red')
+    Plot(p1, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Cumulative Hot Water Draw Volume, Data (gal)'], 'circle', 'p1_Data', legend = 'Data', color = 'blue')
 
     p2 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Ambient Temperature (deg F)')
     p2.title.text_font_size = '12pt'
-    p2.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Ambient Temperature (deg F)'], legend = 'Model', color = 'red')
-    p2.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Ambient Temperature, Data (deg F)'], legend = 'Data', color = 'blue')
+    Plot(p2, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Ambient Temperature (deg F)'], 'line', 'p2_Model', legend = 'Model', color = 'red')
+    Plot(p2, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Ambient Temperature, Data (deg F)'], 'circle', 'p2_Data', legend = 'Data', color = 'blue')
 
     p3 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Inlet Temperature (deg F)')
     p3.title.text_font_size = '12pt'
-    p3.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Inlet Water Temperature (deg F)'], legend = 'Model', color = 'red')
-    p3.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Inlet Water Temperature, Data (deg F)'], legend = 'Data', color = 'blue')
+    Plot(p3, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Inlet Water Temperature (deg F)'], 'line', 'p3_Model', legend = 'Model', color = 'red')
+    Plot(p3, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Inlet Water Temperature, Data (deg F)'], 'circle', 'p3_Data', legend = 'Data', color = 'blue')
 
     p4 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Tank Temperature (deg F)')
     p4.title.text_font_size = '12pt'
-    p4.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Tank Temperature (deg F)'], legend = 'Model', color = 'red')
-    p4.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Tank Temperature, Data (deg F)'], legend = 'Data', color = 'blue')
+    Plot(p4, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Tank Temperature (deg F)'], 'line', 'p4_Model', legend = 'Model', color = 'red')
+    Plot(p4, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Tank Temperature, Data (deg F)'], 'circle', 'p4_Data', legend = 'Data', color = 'blue')
 
     p5 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Energy Added (Btu)')
     p5.title.text_font_size = '12pt'
-    p5.line(x = Compare_To_MeasuredData['Time (min)'], y = Model['Energy Added Total (Btu)'], legend = 'Model', color = 'red')
-    p5.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Energy Added, Data (Btu)'], legend = 'Data', color = 'blue')
+    Plot(p5, Compare_To_MeasuredData['Time (min)'], Model['Energy Added Total (Btu)'], 'line', 'p5_Model', legend = 'Model', color = 'red')
+    Plot(p5, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Energy Added, Data (Btu)'], 'circle', 'p5_Data', legend = 'Data', color = 'blue')
 
     p6 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'COP')
     p6.title.text_font_size = '12pt'
-    p6.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['COP Gas'], legend = 'Model', color = 'red')
-    p6.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['COP, Data'], legend = 'Data', color = 'blue')
+    Plot(p6, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['COP Gas'], 'line', 'p6_Model', legend = 'Model', color = 'red')
+    Plot(p6, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['COP, Data'], 'circle', 'p6_Data', legend = 'Data', color = 'blue')
 
     p7 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Energy Added Heat Pump (Btu)')
     p7.title.text_font_size = '12pt'
-    p7.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Energy Added Heat Pump, Model (Btu)'], legend = 'Model', color = 'red')
-    p7.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu)'], legend = 'Data', color = 'blue')
+    Plot(p7, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Energy Added Heat Pump, Model (Btu)'], 'line', 'p7_Model', legend = 'Model', color = 'red')
+    Plot(p7, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu)'], 'circle', 'p7_Data', legend = 'Data', color = 'blue')
 
     p8 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Energy Added Heat Pump (Btu/min)')
     p8.title.text_font_size = '12pt'
-    p8.line(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Energy Added Heat Pump (Btu/min)'], legend = 'Model', color = 'red')
-    p8.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu/min)'], legend = 'Data', color = 'blue')
+    Plot(p8, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Energy Added Heat Pump (Btu/min)'], 'line', 'p8_Model', legend = 'Model', color = 'red')
+    Plot(p8, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu/min)'], 'circle', 'p8_Data', legend = 'Data', color = 'blue')
 
     p9 = figure(width=1600, height= 400, x_axis_label='Time (min)', y_axis_label = 'Timesteps (min)')
     p9.title.text_font_size = '12pt'
-    p9.line(x = Compare_To_MeasuredData['Time (min)'], y = Model['Timestep (min)'], legend = 'Model', color = 'red')
-    p9.circle(x = Compare_To_MeasuredData['Time (min)'], y = Compare_To_MeasuredData['Timestep (min)'], legend = 'Data', color = 'blue')
+    Plot(p9, Compare_To_MeasuredData['Time (min)'], Model['Timestep (min)'], 'line', 'p9_Model', legend = 'Model', color = 'red')
+    Plot(p9, Compare_To_MeasuredData['Time (min)'], Compare_To_MeasuredData['Timestep (min)'], 'circle', 'p9_Data', legend = 'Data', color = 'blue')
 
     p = gridplot([[p1],[p2], [p3], [p4], [p5], [p6], [p7], [p8], [p9]])
     output_file(os.path.dirname(__file__) + os.sep + 'Validation Data\Validation Plots.html', title = 'Validation Data')
     save(p)
 
-    PercentError_Gas = (Compare_To_MeasuredData['Energy Added Total (Btu)'].sum() - Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu)'].sum()) / Compare_To_MeasuredData['Energy Added, Data (Btu)'].sum() * 100
-    PercentError_COP = (Compare_To_MeasuredData['COP Gas'].mean() - Compare_To_MeasuredData['COP, Data'].mean()) / Compare_To_MeasuredData['COP, Data'].mean() * 100
+    PercentError_Gas = Errors['PercentError_Gas']
+    PercentError_COP = Errors['PercentError_COP']
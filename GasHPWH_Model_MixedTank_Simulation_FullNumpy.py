@@ -96,45 +96,32 @@ FiringRate_HeatPump = 2930.72 #W, heat consumed by the heat pump
 ElectricityConsumption_Active = 158.5 #W, electricity consumed by the fan when the heat pump is running
 ElectricityConsumption_Idle = 5 #W, electricity consumed by the HPWH when idle
 NOx_Output = 10 #ng/J, NOx production of the HP when active
+CO2_Output_Gas = 0.0053 #metric tons/therm, CO2 production when gas absorption heat pump is active
+CO2_Output_Electricity = 0.212115 #ton/MWh, CO2 production when the HPWH consumes electricity. Default value is the average used in California
 
 #%%---------------CONSTANT DECLARATIONS AND CALCULATIONS-----------------------
-#Constants used in water-based calculations
-SpecificHeat_Water = 0.998 #Btu/(lb_m-F) @ 80 deg F, http://www.engineeringtoolbox.com/water-properties-d_1508.html
-Density_Water = 8.3176 #lb-m/gal @ 80 deg F, http://www.engineeringtoolbox.com/water-density-specific-weight-d_595.html
-
 #Constants used for unit conversions
 Hours_In_Day = 24 #The number of hours in a day
 Minutes_In_Hour = 60 #The number of minutes in an hour
-Seconds_In_Minute = 60 #The number of seconds in a minute
-W_To_BtuPerHour = 3.412142 #Converting from Watts to Btu/hr
-K_To_F_MagnitudeOnly = 1.8/1. #Converting from K/C to F. Only applicable for magnitudes, not actual temperatures (E.g. Yes for "A temperature difference of 10 C" but not for "The water temperature is 40 C")
-
-#Calculating the NOx production rate of the HPWH when HP is active
-NOx_Production_Rate = NOx_Output * FiringRate_HeatPump * Seconds_In_Minute
-
-#Converting quantities from SI units provided by Alex to (Incorrect, silly, obnoxious) IP units
-Coefficient_JacketLoss = Coefficient_JacketLoss * W_To_BtuPerHour * K_To_F_MagnitudeOnly #Converts Coefficient_JacketLoss from W/K to Btu/hr-F
-Power_Backup = Power_Backup * W_To_BtuPerHour #Btu/hr
-FiringRate_HeatPump = FiringRate_HeatPump * W_To_BtuPerHour #Btu/hr
-
-#Calculating the thermal mass of the water in the storage tank
-ThermalMass_Tank = Volume_Tank * Density_Water * SpecificHeat_Water
 
 #Reading in the coefficients describing the COP of the gas HPWH as a function of the temperature of the water in the tank
 Coefficients_COP = np.fromfile(os.path.dirname(__file__) + os.sep + 'Coefficients' + os.sep + 'COP_Function_TReturn_F_6Nov2019.csv')
 
-#Stores the parameters describing the HPWH in a list for use in the model
-Parameters = [Coefficient_JacketLoss,
-                Power_Backup,
-                Threshold_Activation_Backup,
-                Threshold_Deactivation_Backup,
-                FiringRate_HeatPump,
-                Temperature_Tank_Set,
-                Temperature_Tank_Set_Deadband,
-                ThermalMass_Tank,
-                ElectricityConsumption_Active,
-                ElectricityConsumption_Idle,
-                NOx_Production_Rate]
+#Stores the parameters describing the HPWH for use in the model. From_Inputs converts the values provided by GTI from SI units to (Incorrect, silly, obnoxious)
+#IP units, calculates the thermal mass of the water in the storage tank, and calculates the NOx and CO2 production rates
+Parameters = GasHPWH.GasHPWH_Parameters.From_Inputs(Temperature_Tank_Set = Temperature_Tank_Set,
+                Temperature_Tank_Set_Deadband = Temperature_Tank_Set_Deadband,
+                Volume_Tank = Volume_Tank,
+                Coefficient_JacketLoss = Coefficient_JacketLoss,
+                Power_Backup = Power_Backup,
+                Threshold_Activation_Backup = Threshold_Activation_Backup,
+                Threshold_Deactivation_Backup = Threshold_Deactivation_Backup,
+                FiringRate_HeatPump = FiringRate_HeatPump,
+                ElectricityConsumption_Active = ElectricityConsumption_Active,
+                ElectricityConsumption_Idle = ElectricityConsumption_Idle,
+                NOx_Output = NOx_Output,
+                CO2_Output_Gas = CO2_Output_Gas,
+                CO2_Output_Electricity = CO2_Output_Electricity)
 
 #%%--------------------------MODELING-----------------------------------------
 
@@ -238,6 +225,8 @@ Model['Energy Added Total (Btu)'] = 0
 Model['COP Gas'] = 0
 Model['Total Energy Change (Btu)'] = 0
 Model['Timestep (min)'] = Timestep
+Model['Hour of Year (hr)'] = (Model.index * Timestep / 60).astype(int) #Hour of the year at the start of each timestep
+Model['Electricity CO2 Multiplier (lb/kWh)'] = 0
 
 #for_testing:
 Model = GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 09:20:00 2020
+
+This script runs a parametric study of the gas HPWH design across the CBECC-Res draw profiles. Instead of copying
+GasHPWH_Model_MixedTank_Simulation_MultipleDraws.py and editing its constants for each design, enter the values of each input to study in
+Grid. Every combination of those values is simulated with every selected draw profile using GasHPWH_Sweep.Run_Sweep, and the results are saved
+in a single table with one row per draw profile and combination.
+
+The sections are as follows:
+Gas HPWH Parameters: The inputs used for every simulation, unless they're included in Grid
+User Inputs: The inputs to sweep, the draw profiles to simulate and the output file
+Modeling: Runs the sweep and saves the results
+
+@author: Peter Grant
+"""
+
+#%%--------------------------IMPORT STATEMENTS--------------------------------
+
+import numpy as np
+import os
+import time
+import GasHPWH_DrawProfile_Catalog
+import GasHPWH_Sweep
+from datetime import datetime
+
+#%%-------------------------GAS HPWH PARAMETERS-----------------------------------
+
+#The inputs describing the gas HPWH, using the names and units of GasHPWH_Model.GasHPWH_Parameters.From_Inputs. Inputs included in Grid below
+#are replaced by the swept values
+Inputs = {'Temperature_Tank_Set': 115, #Deg F, set temperature of the HPWH
+          'Temperature_Tank_Set_Deadband': 10, #Deg F, deadband on the thermostat
+          'Volume_Tank': 65, #gal, volume of water held in the storage tank
+          'Coefficient_JacketLoss': 2.638, #W/K
+          'Power_Backup': 1250, #W, electricity consumption of the backup resistance elements
+          'Threshold_Activation_Backup': 95, #Deg F, backup element operates when tank temperature is below this threshold
+          'Threshold_Deactivation_Backup': 105, #Deg F, backup element disengages above this temperature after it has been engaged
+          'FiringRate_HeatPump': 2930.72, #W, Natural gas consumption rate when the heat pump is active
+          'ElectricityConsumption_Active': 110, #W, electricity consumed by the HPWH when the heat pump is running
+          'ElectricityConsumption_Idle': 5, #W, electricity consumed by the HPWH when idle
+          'NOx_Output': 10, #ng/J, NOx production of the HP when active
+          'CO2_Output_Gas': 0.0053, #metric tons/therm, CO2 production when gas absorption heat pump is active
+          'CO2_Output_Electricity': 0.212115} #ton/MWh, CO2 production when the HPWH consumes electricity
+Temperature_Tank_Initial = 115 #Deg F, initial temperature of water in the storage tank
+Temperature_Ambient = 68 #Deg F, temperature of the ambient air
+Coefficient_COP = -0.0025 #The coefficient in the COP equation
+Constant_COP = 2.0341 #The constant in the COP equation
+
+#%%--------------------------USER INPUTS------------------------------------------
+
+#The values of each input to sweep. Every combination is simulated, so the number of simulations per draw profile is the product of the
+#number of values of each input. A list of dictionaries, one per combination, can be used instead to simulate specific designs
+Grid = {'Volume_Tank': [40, 50, 65, 80],
+        'Temperature_Tank_Set': [115, 125, 135],
+        'Temperature_Tank_Set_Deadband': [5, 10, 15]}
+
+#The draw profiles to simulate, selected from the catalog by the fields in their file names
+Building_Type = 'Single' #'Single' or 'Multi'
+Water = 'Hot' #'Hot' or 'Mixed'
+SDLM = 'Yes' #'Yes' or 'No'
+Version = 2019 #2016 or 2019
+runs_limit = None #Enter None to simulate every selected draw profile, or a number to only simulate that many
+
+Timestep = 5 #Timestep to use in the draw profile and simulation, in minutes
+Workers = 1 #Number of processes used to run the simulations. Enter None to use one per CPU
+
+Path_DrawProfile_Base_Path = os.path.dirname(__file__) + os.sep + 'Data' + os.sep + 'Draw_Profiles'
+Path_Output = os.path.dirname(__file__) + os.sep + 'Output' + os.sep + 'Sweep_' + datetime.now().strftime("%m%d%y_%H%M") + '.csv'
+Path_Journal = os.path.dirname(__file__) + os.sep + 'Output' + os.sep + 'Journal_Sweep.jsonl' #Records each finished draw profile, so rerunning the script after a crash only simulates the rest. Enter None to not keep a journal, or delete the file to start over
+
+#%%--------------------------MODELING-----------------------------------------
+
+Regression_COP = np.poly1d([Coefficient_COP, Constant_COP]) #COP of the heat pump as a function of the temperature of water in the tank
+
+Catalog = GasHPWH_DrawProfile_Catalog.Update_Catalog(Path_DrawProfile_Base_Path)
+Draw_Profiles = GasHPWH_DrawProfile_Catalog.Query(Catalog, Bldg = Building_Type, Wat = Water, SDLM = SDLM, Ver = Version)
+if runs_limit != None:
+    Draw_Profiles = Draw_Profiles.iloc[:runs_limit]
+
+if __name__ == '__main__': #When Workers > 1 each worker process imports this script, and must not start simulations of its own
+    Start = time.time()
+    Results = GasHPWH_Sweep.Run_Sweep(Grid, Draw_Profiles, Inputs, Timestep, Regression_COP, Temperature_Tank_Initial, Temperature_Ambient,
+                                      Workers = Workers, Path_Output = Path_Output, Path_Journal = Path_Journal)
+    print('script ran {0} simulations in {1:.1f} seconds'.format(len(Results), time.time() - Start))
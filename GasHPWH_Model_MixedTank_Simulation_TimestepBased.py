@@ -59,7 +59,7 @@ import os
 import sys
 import time
 import GasHPWH_Model as GasHPWH
-from linetimer import CodeTimer
+import GasHPWH_ResultStore
 from datetime import datetime
 import GasHPWH_SupportingFunctions as GasHPWH_Support
 
@@ -99,7 +99,8 @@ Filename_WeatherFile = 'USA_WI_Milwaukee-Mitchell.Intl.AP.726400_TMY3.epw'
 Path_WeatherData = Folder_EPlusOutputData + os.sep + Filename_WeatherFile
 
 Path_DrawProfile_Output_Base_Path = os.path.dirname(__file__) + os.sep + 'Output'
-Path_DrawProfile_Output_File_Name = 'Output_' + Filename_EPlusOutputData #Save the file with Output_ followed by the name of the draw profile
+Output_Format = 'npz' #'npz' saves the results in a compressed file read with GasHPWH_ResultStore.Read_Run, 'csv' saves them as a csv file
+Path_DrawProfile_Output_File_Name = 'Output_' + os.path.splitext(Filename_EPlusOutputData)[0] + '.' + Output_Format #Save the file with Output_ followed by the name of the draw profile
 Path_DrawProfile_Output = Path_DrawProfile_Output_Base_Path + os.sep + Path_DrawProfile_Output_File_Name
 
 vary_inlet_temp = True # enter False to fix inlet water temperature constant, and True to take the inlet water temperature from the draw profile file (to make it vary by climate zone)
@@ -109,55 +110,27 @@ vary_inlet_temp = True # enter False to fix inlet water temperature constant, an
 Coefficients_COP = [Coefficient_COP, Constant_COP] #combines the coefficient and the constant into an array
 Regression_COP = np.poly1d(Coefficients_COP) #Creates a 1-d linear regression stating the COP of the heat pump as a function of the temperature of water in the tank
 
-#Constants used in water-based calculations
-SpecificHeat_Water = 0.998 #Btu/(lb_m-F) @ 80 deg F, http://www.engineeringtoolbox.com/water-properties-d_1508.html
-Density_Water = 8.3176 #lb-m/gal @ 80 deg F, http://www.engineeringtoolbox.com/water-density-specific-weight-d_595.html
-
 #Constants used for unit conversions
-Hours_In_Day = 24 #The number of hours in a day
-Minutes_In_Hour = 60 #The number of minutes in an hour
-Seconds_In_Minute = 60 #The number of seconds in a minute
 W_To_BtuPerHour = 3.412142 #Converting from Watts to Btu/hr
 K_To_F_MagnitudeOnly = 1.8/1. #Converting from K/C to F. Only applicable for magnitudes, not actual temperatures (E.g. Yes for "A temperature difference of 10 C" but not for "The water temperature is 40 C")
-Btu_In_Therm = 100000 #The number of Btus in a therm
-Pounds_In_MetricTon = 2204.62 #Pounds in a metric ton
-Pounds_In_Ton = 2000 #Pounds in a US ton
-kWh_In_MWh = 1000 #kWh in MWh
-
-#Calculating the NOx production rate of the HPWH when HP is active
-NOx_Production_Rate = NOx_Output * FiringRate_HeatPump * Seconds_In_Minute
-
-#Calculating the CO2 production when the heat pump is active
-CO2_Production_Rate_Gas = CO2_Output_Gas * FiringRate_HeatPump * W_To_BtuPerHour * (1/Minutes_In_Hour) * (1/Btu_In_Therm) * Pounds_In_MetricTon
-
-#Calculating the CO2 produced per kWh of electricity consumed
-CO2_Production_Rate_Electricity = CO2_Output_Electricity * Pounds_In_Ton / kWh_In_MWh
-CO2_Production_Rate_Electricity = pd.Series(data = CO2_Production_Rate_Electricity)
-CO2_Production_Rate_Electricity = CO2_Production_Rate_Electricity.repeat(8760)
-CO2_Production_Rate_Electricity.reset_index(inplace = True, drop = True)
-
-#Converting quantities from SI units provided by Alex to (Incorrect, silly, obnoxious) IP units
-Coefficient_JacketLoss = Coefficient_JacketLoss_WPerK * W_To_BtuPerHour / K_To_F_MagnitudeOnly #Converts Coefficient_JacketLoss from W/K to Btu/hr-F
-Power_Backup = Power_Backup * W_To_BtuPerHour #Btu/hr
-FiringRate_HeatPump = FiringRate_HeatPump * W_To_BtuPerHour #Btu/hr
-
-#Calculating the thermal mass of the water in the storage tank
-ThermalMass_Tank = Volume_Tank * Density_Water * SpecificHeat_Water
-
-#Stores the parameters describing the HPWH in a list for use in the model
-Parameters = [Coefficient_JacketLoss, #0
-                Power_Backup, #1
-                Threshold_Activation_Backup, #2
-                Threshold_Deactivation_Backup, #3
-                FiringRate_HeatPump, #4
-                Temperature_Tank_Set, #5
-                Temperature_Tank_Set_Deadband, #6
-                ThermalMass_Tank, #7
-                ElectricityConsumption_Active, #8
-                ElectricityConsumption_Idle, #9
-                NOx_Production_Rate, #10
-                CO2_Production_Rate_Gas, #11
-                CO2_Production_Rate_Electricity] #12
+
+#Stores the parameters describing the HPWH for use in the model. From_Inputs converts the values provided by GTI from SI units to (Incorrect, silly, obnoxious)
+#IP units, calculates the thermal mass of the water in the storage tank, and calculates the NOx and CO2 production rates
+#The single electricity CO2 multiplier specified above is used for every hour of the year
+Parameters = GasHPWH.GasHPWH_Parameters.From_Inputs(Temperature_Tank_Set = Temperature_Tank_Set,
+                Temperature_Tank_Set_Deadband = Temperature_Tank_Set_Deadband,
+                Volume_Tank = Volume_Tank,
+                Coefficient_JacketLoss = Coefficient_JacketLoss_WPerK,
+                Power_Backup = Power_Backup,
+                Threshold_Activation_Backup = Threshold_Activation_Backup,
+                Threshold_Deactivation_Backup = Threshold_Deactivation_Backup,
+                FiringRate_HeatPump = FiringRate_HeatPump,
+                ElectricityConsumption_Active = ElectricityConsumption_Active,
+                ElectricityConsumption_Idle = ElectricityConsumption_Idle,
+                NOx_Output = NOx_Output,
+                CO2_Output_Gas = CO2_Output_Gas,
+                CO2_Output_Electricity = CO2_Output_Electricity)
+Parameters = Parameters._replace(Coefficient_JacketLoss = Coefficient_JacketLoss_WPerK * W_To_BtuPerHour / K_To_F_MagnitudeOnly) #This script divides by K_To_F_MagnitudeOnly when converting from W/K to Btu/hr-F, instead of multiplying as From_Inputs does
 
 #%%--------------------------MODELING-----------------------------------------
 
@@ -265,7 +238,10 @@ Model['CO2 Production (lb)'] = 0
 Model = GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP)
 
 #%%--------------------------WRITE RESULTS TO FILE-----------------------------------------
-Model.to_csv(Path_DrawProfile_Output, index = False) #Save the model to the declared file.
+if Output_Format == 'npz':
+    GasHPWH_ResultStore.Write_Run(Path_DrawProfile_Output, Model, {'Draw Profile': Filename_EPlusOutputData}) #Save the model to the declared file, with the name of the draw profile
+else:
+    Model.to_csv(Path_DrawProfile_Output, index = False) #Save the model to the declared file.
 
 ET = time.time() #begin to time the script
 print('script ran in {0} seconds'.format((ET - ST)))
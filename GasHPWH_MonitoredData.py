@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:15:00 2020
+
+This module reads the data collected in GTI's field monitoring project and converts it into the inputs needed by the gas HPWH model. It
+repairs the cumulative counters after data logger resets, and can read, repair and simulate months of 10 second data one chunk at a time.
+
+@author: Peter Grant
+"""
+
+import pandas as pd
+import numpy as np
+import csv
+import GasHPWH_Model as GasHPWH
+
+Columns_Numeric = ['ELAPSED TIME', 'Water Flow', 'Gas Meter', 'Power Draw', 'Mid Tank', 'Indoor Temp', 'Water In Temp'] #Measurements converted to numbers when reading a data file
+Counters = ['Water Flow', 'Gas Meter', 'Power Draw'] #Cumulative measurements that restart when the data logger resets
+Btu_Per_CubicFoot_NaturalGas = 1015 #Energy density of natural gas, in Btu/ft^3
+Btu_Per_WattHour = 3.412142 #Conversion factor between Btu and W-h
+Hours_In_Day = 24 #The number of hours in a day
+Columns_Simulation = ['Jacket Losses (Btu)', 'Energy Withdrawn (Btu)', 'Energy Added Backup (Btu)', 'Energy Added Heat Pump (Btu)', 'Energy Added Total (Btu)',
+                      'COP Gas', 'Total Energy Change (Btu)'] #Columns initialized at 0 before simulating, as in the simulation scripts
+
+def Read_Monitored_Data(Path):
+    #Reads a GTI data file, converting the measurements in Columns_Numeric to floats and TIME to datetimes
+    Draw_Profile = pd.read_csv(Path, header = 1, skiprows = [2], low_memory = False) #The second row of the file holds the measurement names, and the third row their units
+    for Column in Columns_Numeric:
+        if Column in Draw_Profile.columns:
+            Draw_Profile[Column] = pd.to_numeric(Draw_Profile[Column], errors = 'coerce')
+    Draw_Profile['TIME'] = Parse_Time(Draw_Profile['TIME'])
+    return Draw_Profile
+
+def Parse_Time(Time, Format_Time = None):
+    #Converts the TIME column of a GTI data file to datetimes. When every value uses the MM/DD/YYYY HH:MM:SS layout the digits are read directly
+    #from their positions, which is much faster than pd.to_datetime. Other layouts use pd.to_datetime, with the optional strftime format Format_Time
+    Time = pd.Series(Time)
+    if Format_Time is None and len(Time) > 0 and (Time.str.len() == 19).all():
+        Characters = Time.to_numpy(dtype = 'U19').view(np.uint32).reshape(-1, 19).astype(np.int64) - ord('0')
+        Digits = Characters[:, [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]]
+        if (Characters[:, [2, 5, 10, 13, 16]] == np.array([ord(Separator) for Separator in '// ::']) - ord('0')).all() and ((Digits >= 0) & (Digits <= 9)).all():
+            Month, Day, Hour, Minute, Second = [Characters[:, Position] * 10 + Characters[:, Position + 1] for Position in [0, 3, 11, 14, 17]]
+            Year = Characters[:, 6] * 1000 + Characters[:, 7] * 100 + Characters[:, 8] * 10 + Characters[:, 9]
+            Date = ((Year - 1970) * 12 + Month - 1).astype('datetime64[M]').astype('datetime64[s]') + ((Day - 1) * 86400 + Hour * 3600 + Minute * 60 + Second).astype('timedelta64[s]')
+            return pd.Series(Date.astype('datetime64[ns]'), index = Time.index)
+    return pd.to_datetime(Time, format = Format_Time)
+
+def Read_Monitored_Data_Chunks(Path, Chunk_Size = 100000, Columns = None, Format_Time = None):
+    #Yields a GTI data file in dataframes of Chunk_Size rows, containing TIME and the measurements in Columns (Columns_Numeric by default). The
+    #index continues from one chunk to the next. Format_Time is an optional strftime format for TIME, as in Parse_Time
+    if Columns is None:
+        Columns = Columns_Numeric
+    with open(Path, newline = '') as File:
+        next(File) #The first row holds the name of the data set
+        Names = next(csv.reader([next(File)])) #The second row holds the measurement names, and the third their units
+    Positions = {Name: Names.index(Name) for Name in ['TIME'] + list(Columns) if Name in Names} #Selected by position, since some files repeat column names
+    Reader = pd.read_csv(Path, header = None, skiprows = 3, usecols = list(Positions.values()), dtype = {Position: float for Name, Position in Positions.items() if Name != 'TIME'},
+                         chunksize = Chunk_Size)
+    for Chunk in Reader:
+        Chunk = Chunk.rename(columns = {Position: Name for Name, Position in Positions.items()})[list(Positions)]
+        Chunk['TIME'] = Parse_Time(Chunk['TIME'], Format_Time)
+        yield Chunk
+
+def Repair_Counter(Counter, Delta_Restart = None, Previous = None, Total = None):
+    #Returns the cumulative counter as if the data logger had never reset. Rows where the counter dropped to less than half of its previous value
+    #are treated as resets, and missing readings are filled with the previous reading. Delta_Restart optionally provides the increase to use in rows where the
+    #counter restarted, instead of the reading itself
+    #When repairing a file in chunks, Previous is the last reading and Total the last repaired value of the previous chunk
+    Counter = pd.Series(Counter, dtype = float).ffill().fillna(0 if Previous is None else Previous).to_numpy() #Missing readings keep the previous reading
+    Delta = np.diff(Counter, prepend = Counter[:1] if Previous is None else Previous)
+    Restart = (Delta < 0) & (Counter < -Delta) #The counter dropped to less than half of its previous reading
+    if Delta_Restart is None:
+        Delta[Restart] = Counter[Restart] #The counter restarted from 0, so the reading is the amount counted since the reset
+    else:
+        Delta[Restart] = np.asarray(Delta_Restart, dtype = float)[Restart]
+    return (Counter[0] if Total is None else Total) + np.cumsum(Delta)
+
+def Repair_Resets(Draw_Profile, Counters = Counters, State = None):
+    #Returns a copy of Draw_Profile with ELAPSED TIME and each of Counters repaired using Repair_Counter
+    #To repair a file one chunk at a time, pass the same dictionary as State for every chunk (Starting with an empty one). It holds the last
+    #readings of the previous chunk, and is updated in place
+    Draw_Profile = Draw_Profile.copy()
+    Delta_Clock = Draw_Profile['TIME'].diff().dt.total_seconds() #Time between readings according to the clock, in seconds
+    if State is not None and 'TIME' in State and len(Draw_Profile) > 0:
+        Delta_Clock.iloc[0] = (Draw_Profile['TIME'].iloc[0] - State['TIME']).total_seconds()
+    Repairs = [('ELAPSED TIME', Delta_Clock.fillna(0).to_numpy())] + [(Counter, None) for Counter in Counters if Counter in Draw_Profile.columns]
+    for Column, Delta_Restart in Repairs:
+        Previous, Total = (None, None) if State is None else State.get(Column, (None, None))
+        Reading_Last = Draw_Profile[Column].ffill().iloc[-1] if len(Draw_Profile) > 0 else np.nan
+        Draw_Profile[Column] = Repair_Counter(Draw_Profile[Column], Delta_Restart, Previous, Total)
+        if State is not None and len(Draw_Profile) > 0:
+            State[Column] = ((0 if Previous is None else Previous) if np.isnan(Reading_Last) else Reading_Last, Draw_Profile[Column].iloc[-1])
+    if State is not None and len(Draw_Profile) > 0:
+        State['TIME'] = Draw_Profile['TIME'].iloc[-1]
+    return Draw_Profile
+
+def Create_Model(Draw_Profile, State = None):
+    #Returns the model dataframe for a repaired GTI data set, with the hot water draw volume in each timestep found from the cumulative water flow
+    #To create the model one chunk at a time, pass the same dictionary as State for every chunk, as in Repair_Resets
+    Model = pd.DataFrame(index = Draw_Profile.index) #Creates a new data frame with the same index as the measured data
+    if State is not None:
+        State.setdefault('Start (s)', Draw_Profile['ELAPSED TIME'].iloc[0])
+    Start = Draw_Profile['ELAPSED TIME'].iloc[0] if State is None else State['Start (s)']
+    Model['Time (min)'] = (Draw_Profile['ELAPSED TIME'] - Start) / 60. #Calculate the elapsed time in minutes, instead of seconds
+    Model['Water Flow'] = Draw_Profile['Water Flow']
+    Model['Hot Water Draw Volume (gal)'] = Draw_Profile['Water Flow'].diff().fillna(0) #The increase in cumulative water flow since the previous timestep, with no draw in the first timestep
+    if State is not None:
+        if 'Water Flow (gal)' in State:
+            Model.iloc[0, Model.columns.get_loc('Hot Water Draw Volume (gal)')] = Draw_Profile['Water Flow'].iloc[0] - State['Water Flow (gal)']
+        State['Water Flow (gal)'] = Draw_Profile['Water Flow'].iloc[-1]
+    Model['Ambient Temperature (deg F)'] = Draw_Profile['Indoor Temp'].astype(float)
+    Model['Inlet Water Temperature (deg F)'] = Draw_Profile['Water In Temp'].astype(float)
+    return Model
+
+def _Simulate_Chunk(Draw_Profile, Model, Timestep, Parameters, Regression_COP, Last, Temperature_Tank_Initial, Compiled):
+    #Simulates one chunk of Simulate_Chunks, continuing from Last, the final simulated row of the previous chunk
+    Model = Model.copy()
+    Model['Tank Temperature (deg F)'] = 0.
+    for Column in Columns_Simulation:
+        Model[Column] = 0.
+    Model['Hour of Year (hr)'] = (Draw_Profile['TIME'].dt.dayofyear - 1) * Hours_In_Day + Draw_Profile['TIME'].dt.hour #Identifies the electricity CO2 multiplier to use in each timestep
+    Model['Electricity CO2 Multiplier (lb/kWh)'] = 0.
+    Model['Timestep (min)'] = Timestep
+    Column_Tank = Model.columns.get_loc('Tank Temperature (deg F)')
+    if Last is None:
+        Model.iloc[0:2, Column_Tank] = Temperature_Tank_Initial
+        return GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP, Compiled)
+    Model.iloc[0, Column_Tank] = Last['Total Energy Change (Btu)'].iloc[0] / Parameters[7] + Last['Tank Temperature (deg F)'].iloc[0] #The calculation skipped for the final row of the previous chunk
+    return GasHPWH.Model_GasHPWH_MixedTank(pd.concat([Last[Model.columns], Model]), Parameters, Regression_COP, Compiled).iloc[1:] #The model reads the previous row's heat pump and backup element state
+
+def Simulate_Chunks(Path, Parameters, Regression_COP, Chunk_Size = 100000, Temperature_Tank_Initial = None, Timestep_Final = 5, Compiled = None):
+    #Reads, repairs and simulates the GTI data file at Path one chunk at a time, yielding the (Draw_Profile, Model) dataframes of each chunk
+    #The results match simulating the whole repaired file with GasHPWH_Model.Model_GasHPWH_MixedTank. The timestep of each row lasts until the
+    #next measurement, so the last row of each chunk is held until the next chunk is read, and the final row of the file lasts Timestep_Final
+    #minutes. Temperature_Tank_Initial defaults to the first measured Mid Tank temperature
+    State = {}
+    Held = None #The last row of the previous chunk, and its model dataframe
+    Last = None #The last simulated row
+    for Chunk in Read_Monitored_Data_Chunks(Path, Chunk_Size):
+        Draw_Profile = Repair_Resets(Chunk, State = State)
+        Model = Create_Model(Draw_Profile, State = State)
+        if Held is not None:
+            Draw_Profile, Model = pd.concat([Held[0], Draw_Profile]), pd.concat([Held[1], Model])
+        Held = Draw_Profile.iloc[-1:], Model.iloc[-1:]
+        Timestep = np.diff(Model['Time (min)'].to_numpy())
+        Draw_Profile, Model = Draw_Profile.iloc[:-1], Model.iloc[:-1]
+        if len(Model) == 0:
+            continue
+        if Temperature_Tank_Initial is None:
+            Temperature_Tank_Initial = float(Draw_Profile['Mid Tank'].iloc[0])
+        Model = _Simulate_Chunk(Draw_Profile, Model, Timestep, Parameters, Regression_COP, Last, Temperature_Tank_Initial, Compiled)
+        Last = Model.iloc[-1:]
+        yield Draw_Profile, Model
+    if Held is not None:
+        if Temperature_Tank_Initial is None:
+            Temperature_Tank_Initial = float(Held[0]['Mid Tank'].iloc[0])
+        Model = _Simulate_Chunk(*Held, float(Timestep_Final), Parameters, Regression_COP, Last, Temperature_Tank_Initial, Compiled)
+        yield Held[0], Model
+
+def Compare_To_MeasuredData(Model, Draw_Profile, Regression_COP):
+    #Compares the model results to the repaired measured data used to create the model
+    #Returns a dataframe containing the model results and the measured data in each timestep, and a dictionary containing the percent errors
+    Compare_To_MeasuredData = Model.copy() #Starts with the same index and data as the model results, then adds data and calculations from the measured data as necessary
+
+    Compare_To_MeasuredData['Hot Water Draw Volume, Model (gal)'] = Compare_To_MeasuredData['Hot Water Draw Volume (gal)'].cumsum() #Cumulative hot water draw volume in the model, to ensure that it matches the measured data
+    Compare_To_MeasuredData['Cumulative Hot Water Draw Volume, Data (gal)'] = Draw_Profile['Water Flow'] - Draw_Profile.loc[0, 'Water Flow'] #The data does not start at 0 gal, so the first value is subtracted from all values to treat it as if it did
+    Compare_To_MeasuredData['Ambient Temperature, Data (deg F)'] = Draw_Profile['Indoor Temp']
+    Compare_To_MeasuredData['Inlet Water Temperature, Data (deg F)'] = Draw_Profile['Water In Temp']
+    Compare_To_MeasuredData['Tank Temperature, Data (deg F)'] = Draw_Profile['Mid Tank'] #Measured temperature at the middle height of the tank
+    Compare_To_MeasuredData['COP, Data'] = Regression_COP(Draw_Profile['Mid Tank']) #COP of the HPWH based on the measured tank water temperature
+
+    Delta_Gas = Draw_Profile['Gas Meter'].diff() #Gas consumed during each timestep, in ft^3. NaN in the first timestep, as there's no previous reading
+    Delta_Power = Draw_Profile['Power Draw'].diff() #Electricity consumed during each timestep, in W-h
+    Delta_Time = Compare_To_MeasuredData['Time (min)'].diff()
+    Energy_Added_HeatPump_Data = Btu_Per_CubicFoot_NaturalGas * Compare_To_MeasuredData['COP, Data'] * Delta_Gas
+
+    Compare_To_MeasuredData['Energy Added, Data (Btu)'] = (Energy_Added_HeatPump_Data + Btu_Per_WattHour * Delta_Power).fillna(0) #Energy added to the water during each timestep in the measured data
+    Compare_To_MeasuredData['Gas Consumption (Btu)'] = 0
+    Compare_To_MeasuredData['Energy Added Heat Pump, Model (Btu)'] = Model['Energy Added Heat Pump (Btu)']
+    Compare_To_MeasuredData['Electricity Consumed, Model (W-h)'] = Model['Electric Usage (W-hrs)'].cumsum()
+    Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu)'] = Energy_Added_HeatPump_Data #Energy added to the water by the heat pump during each timestep in the measured data
+    Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu/min)'] = Energy_Added_HeatPump_Data / Delta_Time
+    if 'Timestep (min)' in Compare_To_MeasuredData.columns: #Keep the model's timestep in the first row, which has no previous measurement
+        Delta_Time.iloc[0] = Compare_To_MeasuredData['Timestep (min)'].iloc[0]
+    Compare_To_MeasuredData['Timestep (min)'] = Delta_Time #Time between each measurement and the previous one
+
+    ElectricityConsumption_Data = Draw_Profile['Power Draw'].iloc[-2] - Draw_Profile.loc[0, 'Power Draw']
+    Errors = {'PercentError_Gas': (Compare_To_MeasuredData['Energy Added Total (Btu)'].sum() - Compare_To_MeasuredData['Energy Added Heat Pump, Data (Btu)'].sum()) / Compare_To_MeasuredData['Energy Added, Data (Btu)'].sum() * 100,
+              'PercentError_COP': (Compare_To_MeasuredData['COP Gas'].mean() - Compare_To_MeasuredData['COP, Data'].mean()) / Compare_To_MeasuredData['COP, Data'].mean() * 100,
+              'PercentError_Electricity': (Compare_To_MeasuredData['Electricity Consumed, Model (W-h)'].iloc[-1] - ElectricityConsumption_Data) / ElectricityConsumption_Data * 100}
+    return Compare_To_MeasuredData, Errors
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 10:05:00 2020
+
+This module keeps the Bokeh validation plots small when comparing the model to months of 10 second monitoring data. Drawing every sample of
+every series makes the html file hundreds of MB and stalls the browser, even though a 1600 pixel wide plot can only show a few thousand points.
+
+Downsample returns the indices of the points to draw, using one of two shape-preserving methods. 'MinMax' splits the time axis into Points
+buckets of equal width (Roughly one per pixel) and keeps the lowest and highest point in each, so every spike and the full range of the data
+stay visible. 'LTTB' (Largest-Triangle-Three-Buckets) splits the data into Points - 2 buckets of equal numbers of points and keeps the point
+in each bucket forming the largest triangle with the point kept in the previous bucket and the average of the next bucket, which follows the
+visual shape of smooth series with exactly Points points. Both methods skip missing values and are calculated with numpy.
+
+Plot_Series draws a downsampled series on a figure, instead of calling figure.line or figure.circle with every point. If Folder_Tiles is
+provided it also writes per-zoom-level tiles using Write_Tiles: at level L the time axis is split into 2^L tiles, each downsampled to Points
+buckets and saved as a binary file in Folder_Tiles/Name/L. The plot then loads the tiles covering the visible range whenever it's zoomed, so
+zooming in shows the full resolution data while the html file only contains the overview. Tiles are loaded by the browser with fetch, so the
+html file must be opened through a web server (Such as python -m http.server in its folder) to use them. Opened directly from the disk the plot
+shows the overview at every zoom level. Folder_Tiles must be in the same folder as the html file.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import os
+
+Levels_Max = 12 #The deepest zoom level written by Write_Tiles
+
+def Downsample_MinMax(X, Y, Points):
+    #Returns the indices of the first and last points, and the lowest and highest point in each of Points equal width buckets of X
+    #X must be sorted
+    if len(X) <= 2 * Points:
+        return np.arange(len(X))
+    Bucket = np.minimum(((X - X[0]) / max(X[-1] - X[0], 1e-300) * Points).astype(np.int64), Points - 1)
+    Order = np.lexsort((Y, Bucket)) #sorted by bucket, then by value within each bucket
+    Start = np.flatnonzero(np.diff(Bucket[Order], prepend = -1)) #The first, and lowest, point in each bucket
+    End = np.append(Start[1:], len(Order)) - 1 #The last, and highest, point in each bucket
+    return np.unique(np.concatenate([[0, len(X) - 1], Order[Start], Order[End]]))
+
+def Downsample_LTTB(X, Y, Points):
+    #Returns the indices of the Points points selected by Largest-Triangle-Three-Buckets, always including the first and last points
+    Length = len(X)
+    if Length <= Points or Points < 3:
+        return np.arange(Length)
+    Edges = (np.arange(Points - 1) * (Length - 2) // (Points - 2) + 1) #Points - 2 buckets between the first and last points
+    Mean_X = np.append(np.add.reduceat(X[1:-1], Edges[:-1] - 1) / np.diff(Edges), X[-1]) #Average of each bucket, followed by the last point
+    Mean_Y = np.append(np.add.reduceat(Y[1:-1], Edges[:-1] - 1) / np.diff(Edges), Y[-1])
+    Keep = np.zeros(Points, dtype = np.int64)
+    Keep[-1] = Length - 1
+    Previous = 0
+    for Bucket in range(Points - 2):
+        Start, End = Edges[Bucket], Edges[Bucket + 1]
+        Area = np.abs((X[Previous] - Mean_X[Bucket + 1]) * (Y[Start:End] - Y[Previous]) - (X[Previous] - X[Start:End]) * (Mean_Y[Bucket + 1] - Y[Previous]))
+        Previous = Start + int(np.argmax(Area))
+        Keep[Bucket + 1] = Previous
+    return Keep
+
+def Downsample(X, Y, Points = 1600, Method = 'MinMax'):
+    #Returns the indices of the points of (X, Y) to draw, skipping points where either value is missing. X must be sorted
+    X, Y = np.asarray(X, dtype = float), np.asarray(Y, dtype = float)
+    Valid = np.flatnonzero(np.isfinite(X) & np.isfinite(Y))
+    if Method == 'MinMax':
+        return Valid[Downsample_MinMax(X[Valid], Y[Valid], Points)]
+    elif Method == 'LTTB':
+        return Valid[Downsample_LTTB(X[Valid], Y[Valid], Points)]
+    raise ValueError("Method must be 'MinMax' or 'LTTB', not {0!r}".format(Method))
+
+def Write_Tiles(X, Y, Folder, Points = 1600, Method = 'MinMax'):
+    #Writes the downsampled tiles of every zoom level to Folder/[Level]/[Tile].bin and returns the number of levels. Each file contains the x
+    #values followed by the y values as little-endian float64. Zooming stops at the level where a tile holds few enough points to be drawn without
+    #downsampling. Each tile also holds the points on either side of it, so lines continue across tile edges
+    X, Y = np.asarray(X, dtype = float), np.asarray(Y, dtype = float)
+    Valid = np.isfinite(X) & np.isfinite(Y)
+    X, Y = X[Valid], Y[Valid]
+    Levels = 0
+    while Levels < Levels_Max and len(X) / 2**Levels > 2 * Points:
+        Levels += 1
+    for Level in range(1, Levels + 1):
+        os.makedirs(Folder + os.sep + str(Level), exist_ok = True)
+        Edges = np.searchsorted(X, np.linspace(X[0], X[-1], 2**Level + 1))
+        for Tile in range(2**Level):
+            Start, End = max(Edges[Tile] - 1, 0), min(Edges[Tile + 1] + 1, len(X))
+            Keep = Start + Downsample(X[Start:End], Y[Start:End], Points, Method)
+            np.concatenate([X[Keep], Y[Keep]]).astype('<f8').tofile(Folder + os.sep + str(Level) + os.sep + str(Tile) + '.bin')
+    return Levels
+
+#Runs in the browser when the plot is zoomed or panned, replacing the plotted points with the tiles covering the visible range
+Code_Tiles = """
+if (source._overview === undefined) { source._overview = source.data; }
+const level = Math.min(levels, Math.max(0, Math.floor(Math.log2(span / (x_range.end - x_range.start)))));
+if (level == 0) {
+    source._key = undefined;
+    if (source.data !== source._overview) { source.data = source._overview; }
+    return;
+}
+const width = span / 2**level;
+const first = Math.max(0, Math.floor((x_range.start - start) / width));
+const last = Math.min(2**level - 1, Math.floor((x_range.end - start) / width));
+const key = level + ':' + first + ':' + last;
+if (source._key === key) { return; }
+source._key = key;
+const tiles = [];
+for (let tile = first; tile <= last; tile++) {
+    tiles.push(fetch(url + '/' + level + '/' + tile + '.bin').then(response => response.arrayBuffer()));
+}
+Promise.all(tiles).then(buffers => {
+    if (source._key === key) {
+        const arrays = buffers.map(buffer => new Float64Array(buffer));
+        const x = new Float64Array(arrays.reduce((length, array) => length + array.length / 2, 0));
+        const y = new Float64Array(x.length);
+        let offset = 0;
+        for (const array of arrays) {
+            x.set(array.subarray(0, array.length / 2), offset);
+            y.set(array.subarray(array.length / 2), offset);
+            offset += array.length / 2;
+        }
+        source.data = {x: x, y: y};
+    }
+}).catch(() => {});
+"""
+
+def Plot_Series(Figure, X, Y, Glyph = 'line', Name = None, Points = 1600, Method = 'MinMax', Folder_Tiles = None, **Properties):
+    #Draws the downsampled series on Figure using the glyph method named by Glyph ('line', 'circle', ...) and returns the renderer. Properties
+    #are passed to the glyph method, such as color or legend. If Folder_Tiles is provided the zoom level tiles are written to Folder_Tiles/Name
+    from bokeh.models import ColumnDataSource, CustomJS #Imported here so the downsampling functions can be used without loading Bokeh
+    X, Y = np.asarray(X, dtype = float), np.asarray(Y, dtype = float)
+    Keep = Downsample(X, Y, Points, Method)
+    Source = ColumnDataSource({'x': X[Keep], 'y': Y[Keep]})
+    Renderer = getattr(Figure, Glyph)(x = 'x', y = 'y', source = Source, **Properties)
+    if Folder_Tiles is not None and len(Keep) > 0:
+        Levels = Write_Tiles(X, Y, Folder_Tiles + os.sep + Name, Points, Method)
+        Callback = CustomJS(args = {'source': Source, 'x_range': Figure.x_range, 'levels': Levels, 'start': float(X[Keep[0]]),
+                                    'span': float(X[Keep[-1]] - X[Keep[0]]), 'url': os.path.basename(Folder_Tiles) + '/' + Name}, code = Code_Tiles)
+        Figure.x_range.js_on_change('start', Callback)
+        Figure.x_range.js_on_change('end', Callback)
+    return Renderer
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 09:10:00 2020
+
+This module saves the full timestep results of simulations in compact compressed .npz files, replacing the csv files written by the
+simulation scripts, and reads them back. Runs can be written by a background thread while the next simulation runs.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import json
+import queue
+import threading
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+
+Max_Pending = 4 #Number of runs that may wait to be written by the background thread before Write_Run_Background waits for the disk
+
+def Downcast_Columns(Model, Precision = np.float32):
+    #Returns a dictionary of the columns of Model as arrays. Columns holding only whole numbers are converted to the smallest integer type that
+    #holds them, and other numbers to Precision. float32 keeps 7 significant digits, which is far more than the model's inputs
+    Columns = {}
+    for Name in Model.columns:
+        Values = Model[Name].to_numpy()
+        if Values.dtype == bool:
+            Columns[Name] = Values
+            continue
+        Values = Values.astype(float)
+        if len(Values) > 0 and np.isfinite(Values).all() and (Values == np.round(Values)).all() and np.abs(Values).max() < 2**31:
+            Columns[Name] = Values.astype(np.result_type(np.min_scalar_type(int(Values.min())), np.min_scalar_type(int(Values.max()))))
+        else:
+            Columns[Name] = Values.astype(Precision)
+    return Columns
+
+def _Prepare_Run(Model, Metadata = None, Precision = np.float32):
+    #Returns the downcast arrays of a run, named by their position, and its metadata including the column names
+    Columns = Downcast_Columns(Model, Precision)
+    Metadata = dict(Metadata or {}, Columns = list(Columns), Rows = len(Model))
+    Arrays = {str(Position): Values for Position, Values in enumerate(Columns.values())}
+    Arrays['Metadata'] = np.array(json.dumps(Metadata, default = lambda Value: Value.item() if isinstance(Value, np.generic) else str(Value)))
+    return Arrays
+
+def _Write_Arrays(Path, Arrays):
+    GasHPWH_Support.Write_Atomic(Path, lambda File: np.savez_compressed(File, **Arrays))
+
+def Write_Run(Path, Model, Metadata = None, Precision = np.float32):
+    #Saves the dataframe Model and the dictionary Metadata to the .npz file at Path
+    _Write_Arrays(Path, _Prepare_Run(Model, Metadata, Precision))
+
+_Queue = queue.Queue(maxsize = Max_Pending) #Runs waiting to be written by the background thread
+_Lock = threading.Lock() #Held while starting or stopping the background thread
+_Thread = None
+_Errors = [] #Errors raised while writing in the background, raised again by Wait or the next Write_Run_Background
+
+def _Writer():
+    #Writes queued runs until there are none left, then stops
+    global _Thread
+    while True:
+        with _Lock:
+            if _Queue.empty():
+                _Thread = None
+                return
+        Path, Arrays = _Queue.get()
+        try:
+            _Write_Arrays(Path, Arrays)
+        except Exception as Error:
+            _Errors.append(Error)
+        finally:
+            _Queue.task_done()
+
+def _Raise_Errors():
+    if _Errors:
+        Error = _Errors.pop(0)
+        _Errors.clear()
+        raise Error
+
+def Write_Run_Background(Path, Model, Metadata = None, Precision = np.float32):
+    #Saves a run in the same way as Write_Run, but returns as soon as the arrays are prepared while a background thread writes the file
+    #Model may be modified or deleted as soon as this returns
+    global _Thread
+    _Raise_Errors()
+    _Queue.put((Path, _Prepare_Run(Model, Metadata, Precision)))
+    with _Lock:
+        if _Thread is None:
+            _Thread = threading.Thread(target = _Writer, name = 'GasHPWH_ResultStore')
+            _Thread.start()
+
+def Wait():
+    #Waits until every run passed to Write_Run_Background has been written, raising the first error that occurred while writing
+    _Queue.join()
+    _Raise_Errors()
+
+def Read_Metadata(Path):
+    #Returns the metadata dictionary of the run saved at Path, including its column names (Columns) and number of rows (Rows)
+    with np.load(Path) as File:
+        return json.loads(str(File['Metadata']))
+
+def Read_Run(Path, Columns = None, Dtype = None):
+    #Returns the run saved at Path as a dataframe. Columns is an optional list of the columns to read. Each column keeps the type it was
+    #stored with unless Dtype is provided (Such as float), in which case every column is converted to it
+    with np.load(Path) as File:
+        Names = json.loads(str(File['Metadata']))['Columns']
+        Columns = Names if Columns is None else list(Columns)
+        Missing = [Name for Name in Columns if Name not in Names]
+        if Missing:
+            raise KeyError('{0} not saved in {1}'.format(Missing, Path))
+        Positions = {Name: Position for Position, Name in enumerate(Names)}
+        Data = {Name: File[str(Positions[Name])] for Name in Columns}
+    if Dtype is not None:
+        Data = {Name: Values.astype(Dtype) for Name, Values in Data.items()}
+    return pd.DataFrame(Data, columns = Columns)
+
+def Read_Runs(Folder):
+    #Returns a dataframe with one row per run saved in Folder, containing the path to the run and its metadata except the column names
+    Runs = []
+    for File in sorted(os.listdir(Folder)):
+        if File.endswith('.npz'):
+            Metadata = Read_Metadata(Folder + os.sep + File)
+            Metadata.pop('Columns')
+            Runs.append(dict(Path = Folder + os.sep + File, **Metadata))
+    return pd.DataFrame(Runs)
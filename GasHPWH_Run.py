@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 09:15:00 2020
+
+This module runs the simulations performed by GasHPWH_Model_MixedTank_Simulation.py and GasHPWH_Model_MixedTank_Simulation_MultipleDraws.py
+as functions, so notebooks and other scripts can import them instead of using %run. The inputs of those scripts are the fields of
+GasHPWH_Config, which can also be read from a JSON file. The same functions are available from the command line, see Main.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import os
+import sys
+import json
+import time
+import argparse
+from collections import namedtuple
+from datetime import datetime
+import GasHPWH_Model as GasHPWH
+import GasHPWH_DrawProfile_Catalog
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+import GasHPWH_ResultStore
+import GasHPWH_Sweep
+
+Folder_Base = os.path.dirname(os.path.abspath(__file__))
+
+#The inputs of the simulation scripts, with their default values. The units of the gas HPWH inputs are those of GasHPWH_Parameters.From_Inputs
+Defaults = {'Temperature_Tank_Initial': 115, #Deg F, initial temperature of water in the storage tank. 115 F is the standard set temperature in CBECC
+            'Temperature_Tank_Set': 115, #Deg F, set temperature of the HPWH
+            'Temperature_Tank_Set_Deadband': 10, #Deg F, deadband on the thermostat
+            'Temperature_Water_Inlet': 40, #Deg F, inlet water temperature. Only used if Vary_Inlet_Temperature = False
+            'Temperature_Ambient': 68, #Deg F, temperature of the ambient air. If Path_Weather is provided this is the indoor temperature
+            'Volume_Tank': 65, #gal, volume of water held in the storage tank
+            'Coefficient_JacketLoss': 2.638, #W/K
+            'Power_Backup': 1250, #W, electricity consumption of the backup resistance elements
+            'Threshold_Activation_Backup': 95, #Deg F, backup element operates when tank temperature is below this threshold
+            'Threshold_Deactivation_Backup': 105, #Deg F, backup element disengages above this temperature after it has been engaged
+            'FiringRate_HeatPump': 2930.72, #W, natural gas consumption rate when the heat pump is active
+            'ElectricityConsumption_Active': 110, #W, electricity consumed by the HPWH when the heat pump is running
+            'ElectricityConsumption_Idle': 5, #W, electricity consumed by the HPWH when idle
+            'NOx_Output': 10, #ng/J, NOx production of the HP when active
+            'CO2_Output_Gas': 0.0053, #metric tons/therm, CO2 production when gas absorption heat pump is active
+            'CO2_Output_Electricity': 0.212115, #ton/MWh, CO2 production when the HPWH consumes electricity. Only used if Vary_CO2_Elec = False
+            'Coefficient_COP': -0.0025, #The coefficient in the COP equation
+            'Constant_COP': 2.0341, #The constant in the COP equation
+            'Building_Type': 'Single', #'Single' or 'Multi', building type of the draw profiles to simulate
+            'Water': 'Hot', #'Hot' or 'Mixed' water draw profiles
+            'SDLM': 'Yes', #'Yes' or 'No' depending on whether the Standard Distribution Loss Multiplier was included in the draw profiles
+            'Version': 2019, #Version of the T24 draw profile data set, 2016 or 2019
+            'Timestep': 5, #min, timestep to use in the draw profile and simulation
+            'Runs_Limit': None, #None to simulate every selected draw profile, or a number to only simulate that many
+            'Vary_Inlet_Temperature': True, #True to take the inlet water temperature from the draw profile, False to use Temperature_Water_Inlet
+            'Vary_CO2_Elec': True, #True to use the hourly CO2 multipliers of each draw profile's climate zone from Path_CO2_Elec, False to use CO2_Output_Electricity
+            'Workers': 1, #Number of processes used to run the simulations, or None to use one per CPU
+            'Path_Weather': None, #Path to an E+ weather file to calculate the ambient temperature from its outdoor temperature, or None to use Temperature_Ambient
+            'Fraction_Outdoor': 0.5, #Only used if Path_Weather is provided. Ambient temperature = Fraction_Outdoor * outdoor temperature + (1 - Fraction_Outdoor) * Temperature_Ambient
+            'Path_DrawProfiles': Folder_Base + os.sep + 'Data' + os.sep + 'Draw_Profiles', #Folder containing the draw profiles
+            'Path_CO2_Elec': Folder_Base + os.sep + 'Data' + os.sep + 'CO2' + os.sep + 'CA2019CarbonOnly-Elec.csv', #File containing the hourly electricity CO2 multipliers
+            'Save_Individual': False, #True to save the full results of every draw profile in Path_Individual_Output
+            'Individual_Output_Format': 'npz', #'npz' saves the full results with GasHPWH_ResultStore, 'csv' saves them as csv files
+            'Output_Prefix': 'OUTPUT_', #Added to the beginning of the name of each draw profile when saving its full results
+            'Path_Individual_Output': Folder_Base + os.sep + 'Output', #Folder for the full results of each draw profile
+            'Path_Summary_Output': Folder_Base + os.sep + 'Output', #Folder for the summary tables
+            'Path_Journal': None} #Journal recording each finished draw profile so an interrupted run continues where it left off, or None
+
+GasHPWH_Config = namedtuple('GasHPWH_Config', list(Defaults), defaults = list(Defaults.values()))
+
+GasHPWH_Inputs = namedtuple('GasHPWH_Inputs', ['Path_DrawProfiles', 'Catalog', 'Path_CO2_Elec', 'CO2_Multipliers']) #Data shared by every simulation, returned by Load_Inputs
+
+Files_Summary = {'Electricity (kWh)': 'kWh_Usage_Summary_', #The prefix of the file each annual total is saved in by Write_Summary_Tables
+                 'Gas (therms)': 'Therms_Usage_Summary_',
+                 'CO2 Production Gas (lb)': 'CO2_Gas_Usage_Summary_',
+                 'CO2 Production Elec (lb)': 'CO2_Electricity_Usage_Summary_'}
+
+def Read_Config(Path = None, **Changes):
+    #Returns the configuration in the JSON file at Path, with any inputs not in the file taking their default values. Changes are keyword
+    #arguments replacing values in the file, such as Read_Config(Path, Workers = 4). Without a Path the defaults are used
+    Values = {}
+    if Path is not None:
+        with open(Path) as File:
+            Values = json.load(File)
+    Values.update(Changes)
+    Unknown = [Name for Name in Values if Name not in GasHPWH_Config._fields]
+    if Unknown:
+        raise ValueError('{0} are not inputs of GasHPWH_Config. The inputs are {1}'.format(Unknown, list(GasHPWH_Config._fields)))
+    return GasHPWH_Config(**Values)
+
+def Write_Config(Config, Path):
+    #Saves Config to the JSON file at Path, in the format read by Read_Config
+    with open(Path, 'w') as File:
+        json.dump(Config._asdict(), File, indent = 4)
+
+def Load_Inputs(Config, Inputs = None, Catalog = True):
+    #Returns the GasHPWH_Inputs used by Config. The parts of Inputs (Returned by an earlier call) read from the same files are reused
+    #Catalog = False doesn't read the draw profile catalog, which is then None, when only the CO2 multipliers are needed
+    Catalog_Draw_Profiles = None
+    if Inputs is not None and Inputs.Path_DrawProfiles == Config.Path_DrawProfiles:
+        Catalog_Draw_Profiles = Inputs.Catalog
+    if Catalog_Draw_Profiles is None and Catalog == True:
+        Catalog_Draw_Profiles = GasHPWH_DrawProfile_Catalog.Update_Catalog(Config.Path_DrawProfiles) #Only files that changed since the catalog was last updated are read
+    CO2_Multipliers = None
+    if Inputs is not None and Inputs.Path_CO2_Elec == Config.Path_CO2_Elec:
+        CO2_Multipliers = Inputs.CO2_Multipliers
+    if CO2_Multipliers is None and Config.Vary_CO2_Elec == True:
+        CO2_Multipliers = GasHPWH_Support.Read_CO2_Multipliers_Electricity(Config.Path_CO2_Elec) #lb/kWh, one column per climate zone
+    return GasHPWH_Inputs(Config.Path_DrawProfiles, Catalog_Draw_Profiles, Config.Path_CO2_Elec, CO2_Multipliers)
+
+def Regression_COP(Config):
+    #Returns the COP of the heat pump as a function of the temperature of water in the tank
+    return np.poly1d([Config.Coefficient_COP, Config.Constant_COP])
+
+def Parameters_Profile(Config, Inputs, ClimateZone):
+    #Returns the GasHPWH_Parameters for a draw profile in ClimateZone, using the hourly electricity CO2 multipliers of that climate zone if
+    #Config.Vary_CO2_Elec == True
+    Parameters = GasHPWH.GasHPWH_Parameters.From_Inputs(**{Name: getattr(Config, Name) for Name in ['Temperature_Tank_Set', 'Temperature_Tank_Set_Deadband',
+                                                         'Volume_Tank', 'Coefficient_JacketLoss', 'Power_Backup', 'Threshold_Activation_Backup',
+                                                         'Threshold_Deactivation_Backup', 'FiringRate_HeatPump', 'ElectricityConsumption_Active',
+                                                         'ElectricityConsumption_Idle', 'NOx_Output', 'CO2_Output_Gas', 'CO2_Output_Electricity']})
+    if Config.Vary_CO2_Elec == True:
+        Parameters = Parameters._replace(CO2_Production_Rate_Electricity = Inputs.CO2_Multipliers['CZ' + str(ClimateZone)])
+    return Parameters
+
+def Select_Draw_Profiles(Config, Inputs):
+    #Returns the rows of the draw profile catalog matching the building type, water type, SDLM and version of Config, limited to Config.Runs_Limit
+    Draw_Profiles = GasHPWH_DrawProfile_Catalog.Query(Inputs.Catalog, Bldg = Config.Building_Type, Wat = Config.Water, SDLM = Config.SDLM, Ver = Config.Version)
+    if Config.Runs_Limit != None and Config.Runs_Limit < len(Draw_Profiles):
+        Draw_Profiles = Draw_Profiles.iloc[:Config.Runs_Limit]
+        print('only simulating {0} draw profiles because of Runs_Limit; set Runs_Limit = None to run all draws'.format(Config.Runs_Limit))
+    return Draw_Profiles.reset_index(drop = True)
+
+def Create_Jobs(Config, Inputs, Draw_Profiles):
+    #Returns the list of simulations used by GasHPWH_Sweep.Run_Draw_Profiles for each row of Draw_Profiles: the path to the draw profile, the
+    #parameters for its climate zone, and the path to save the full results to (None if Config.Save_Individual == False)
+    Jobs = []
+    for Path_DrawProfile, File, ClimateZone in zip(Draw_Profiles['Path'], Draw_Profiles['File'], Draw_Profiles['CZ']):
+        Path_Output = None
+        if Config.Save_Individual == True:
+            Path_Output = Config.Path_Individual_Output + os.sep + Config.Output_Prefix + File[:-len('.csv')] + '.' + Config.Individual_Output_Format
+        Jobs.append((Path_DrawProfile, Parameters_Profile(Config, Inputs, ClimateZone), Path_Output))
+    return Jobs
+
+def Run_MultipleDraws(Config = None, Inputs = None):
+    #Simulates every draw profile selected by Config and returns a dataframe with one row per draw profile, containing its file name, the fields of
+    #its name and its annual totals. Inputs is an optional GasHPWH_Inputs returned by Load_Inputs, to avoid reading the inputs again
+    if Config is None:
+        Config = GasHPWH_Config()
+    Inputs = Load_Inputs(Config, Inputs)
+    Draw_Profiles = Select_Draw_Profiles(Config, Inputs)
+    Jobs = Create_Jobs(Config, Inputs, Draw_Profiles)
+    Results = GasHPWH_Sweep.Run_Draw_Profiles(Jobs, Config.Timestep, Regression_COP(Config), Config.Temperature_Tank_Initial, Config.Temperature_Ambient,
+                                              Temperature_Water_Inlet = None if Config.Vary_Inlet_Temperature == True else Config.Temperature_Water_Inlet,
+                                              Workers = Config.Workers, Path_Weather = Config.Path_Weather, Fraction_Outdoor = Config.Fraction_Outdoor,
+                                              Path_Journal = Config.Path_Journal)
+    Results.insert(0, 'File', Draw_Profiles['File'])
+    for Position, Field in enumerate(GasHPWH_DrawProfile_Catalog.Fields_Name, 1):
+        Results.insert(Position, Field, Draw_Profiles[Field])
+    return Results
+
+def Summary_Tables(Results):
+    #Returns a dictionary of the climate zone x conditioned floor area table of each annual total in Results (Returned by Run_MultipleDraws)
+    return {Column: Results.pivot(index = 'CZ', columns = 'CFA', values = Column).rename_axis(index = None, columns = None) for Column in Files_Summary}
+
+def Write_Summary_Tables(Tables, Folder, Date_Time_String = None):
+    #Saves each table returned by Summary_Tables to a csv file in Folder, named as in Files_Summary followed by Date_Time_String (The current date
+    #and time by default). Returns the paths of the files
+    if Date_Time_String is None:
+        Date_Time_String = datetime.now().strftime("%m%d%y_%H%M")
+    Paths = []
+    for Column, Table in Tables.items():
+        Paths.append(Folder + os.sep + Files_Summary[Column] + Date_Time_String + '.csv')
+        Table.to_csv(Paths[-1])
+    return Paths
+
+def Run_Simulation(Path_DrawProfile, Config = None, Inputs = None, Path_Output = None):
+    #Simulates the draw profile at Path_DrawProfile and returns the full timestep results of GasHPWH_Model.Model_GasHPWH_MixedTank. The climate
+    #zone of the CO2 multipliers is taken from the file name. If Path_Output is provided the results are also saved there, using
+    #GasHPWH_ResultStore if it ends with .npz and as a csv file otherwise
+    if Config is None:
+        Config = GasHPWH_Config()
+    Inputs = Load_Inputs(Config, Inputs, Catalog = False)
+    File = os.path.basename(Path_DrawProfile)
+    Fields = GasHPWH_DrawProfile_Catalog.Parse_File_Name(File)
+    if Fields is None and Config.Vary_CO2_Elec == True:
+        raise ValueError('the climate zone of {0} can not be read from its name. Set Vary_CO2_Elec = False to use CO2_Output_Electricity'.format(File))
+    Parameters = Parameters_Profile(Config, Inputs, None if Fields is None else Fields['CZ'])
+    Model = GasHPWH_Sweep.Create_Model(Path_DrawProfile, Config.Timestep, Config.Temperature_Tank_Initial, Config.Temperature_Ambient,
+                                       None if Config.Vary_Inlet_Temperature == True else Config.Temperature_Water_Inlet, Config.Path_Weather, Config.Fraction_Outdoor)
+    Model = GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP(Config))
+    if Path_Output is not None:
+        if Path_Output.endswith('.npz'):
+            GasHPWH_ResultStore.Write_Run(Path_Output, Model, {'Draw Profile': File, 'Timestep (min)': Config.Timestep})
+        else:
+            Model.to_csv(Path_Output, index = False)
+    return Model
+
+def Parse_Value(Text):
+    #Returns the value of a --set argument: JSON values (Numbers, true, false, null) are converted, anything else is kept as a string
+    try:
+        return json.loads(Text)
+    except ValueError:
+        return Text
+
+def Main(Arguments = None):
+    #Runs the command line interface, with an optional configuration file and individual values changed with --set, e.g.
+    #    python GasHPWH_Run.py multipledraws --config Study.json --set Workers=4 --set Volume_Tank=80
+    #    python GasHPWH_Run.py simulate Data/Draw_Profiles/Bldg=Single_CZ=1_Wat=Hot_Prof=5_SDLM=Yes_CFA=3500_Inc=FSCDB_Ver=2019.csv --output Output/Model.npz
+    #    python GasHPWH_Run.py config Study.json
+    Parser = argparse.ArgumentParser(description = 'Runs the gas HPWH model')
+    Parser.add_argument('Command', choices = ['multipledraws', 'simulate', 'config'],
+                        help = 'multipledraws simulates every selected draw profile, simulate a single draw profile, config saves the configuration to a file')
+    Parser.add_argument('Path', nargs = '?', help = 'draw profile to simulate, or the file to save the configuration to')
+    Parser.add_argument('--config', help = 'JSON configuration file, see GasHPWH_Run.GasHPWH_Config for the inputs')
+    Parser.add_argument('--set', action = 'append', default = [], metavar = 'NAME=VALUE', help = 'changes one input of the configuration, can be repeated')
+    Parser.add_argument('--output', help = 'simulate: file to save the full results to (.npz or .csv)')
+    Arguments = Parser.parse_args(Arguments)
+    if Arguments.Command != 'multipledraws' and Arguments.Path is None:
+        Parser.error('{0} requires a Path'.format(Arguments.Command))
+    Changes = {}
+    for Setting in Arguments.set:
+        Name, Separator, Value = Setting.partition('=')
+        if not Separator:
+            Parser.error('--set {0} must be NAME=VALUE'.format(Setting))
+        Changes[Name] = Parse_Value(Value)
+    try:
+        Config = Read_Config(Arguments.config, **Changes)
+    except ValueError as Error:
+        Parser.error(str(Error))
+
+    Start = time.time()
+    if Arguments.Command == 'config':
+        Write_Config(Config, Arguments.Path)
+        return
+    if Arguments.Command == 'simulate':
+        Model = Run_Simulation(Arguments.Path, Config, Path_Output = Arguments.output)
+        print('simulated {0} timesteps in {1:.1f} seconds, {2:.1f} kWh, {3:.1f} therms'.format(len(Model), time.time() - Start,
+              Model['Electric Usage (W-hrs)'].sum() / 1000, Model['Gas Usage (Btu)'].sum() / 100000))
+        return
+    Results = Run_MultipleDraws(Config)
+    Paths = Write_Summary_Tables(Summary_Tables(Results), Config.Path_Summary_Output)
+    print('simulated {0} draw profiles in {1:.1f} seconds, saved {2}'.format(len(Results), time.time() - Start, ', '.join(Paths)))
+
+if __name__ == '__main__': #When Workers > 1 each worker process imports this module, and must not start simulations of its own
+    Main(sys.argv[1:])
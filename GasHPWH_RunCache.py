@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 27 08:45:00 2020
+
+This module stores the totals of completed simulations, so rerunning a parametric study after changing one parameter or one draw profile only
+simulates the combinations that changed. GasHPWH_Sweep uses it for every simulation that doesn't save its full results. Each entry is a small
+.npy file named by a hash of the model code, inputs and parameters, and the least recently used entries are deleted when the folder grows beyond
+Max_Size_Cache.
+
+@author: Peter Grant
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import sys
+import hashlib
+import argparse
+import GasHPWH_DrawProfile_Cache
+import GasHPWH_SupportingFunctions as GasHPWH_Support
+
+Cache_Version = 1 #Increment when a change outside GasHPWH_Model.py affects the results, so old entries are not used
+Folder_Cache = os.path.dirname(os.path.abspath(__file__)) + os.sep + 'Data' + os.sep + 'Cache' + os.sep + 'Runs' #Default location of the cache files
+Max_Size_Cache = 512 * 1024 ** 2 #bytes, the least recently used entries are deleted when the cache folder grows beyond this size
+Use_Cache = True #Set to False to stop GasHPWH_Sweep from using the cache, unless requested with the Cache keyword
+
+_Hash_Model = None #Hash of the contents of GasHPWH_Model.py, calculated the first time it's needed
+
+def Hash_Model():
+    #Returns a hash of the contents of GasHPWH_Model.py
+    global _Hash_Model
+    if _Hash_Model is None:
+        with open(os.path.dirname(os.path.abspath(__file__)) + os.sep + 'GasHPWH_Model.py', 'rb') as File:
+            _Hash_Model = hashlib.sha1(File.read()).hexdigest()
+    return _Hash_Model
+
+def Hash_Arrays(*Arrays):
+    #Returns a hash of the type, shape and values of each array
+    Hash = hashlib.sha1()
+    for Array in Arrays:
+        Array = np.ascontiguousarray(Array)
+        Hash.update('{0}|{1}|'.format(Array.dtype.str, Array.shape).encode())
+        Hash.update(Array.tobytes())
+    return Hash.hexdigest()
+
+def Key_Run(Model, Hash_Inputs, Parameters, Regression_COP, Temperature_Tank_Initial, *Options):
+    #Returns the key of a simulation. Model is the name of the model, Hash_Inputs the result of Hash_Arrays for the input arrays, and Options any
+    #other values that affect the results. The key also includes Cache_Version and the contents of GasHPWH_Model.py, so changes to the model
+    #create new keys instead of returning results calculated by an older version
+    Key = '{0}|{1}|{2}|{3}|{4}|{5!r}|{6!r}|{7!r}'.format(Cache_Version, Hash_Model(), Model, Hash_Inputs, Parameters.Hash(), np.asarray(Regression_COP.coeffs, dtype = float).tolist(),
+                                                        float(Temperature_Tank_Initial), Options)
+    return hashlib.sha1(Key.encode()).hexdigest()
+
+def Load(Key, Folder = None):
+    #Returns the array stored for Key, or None if it isn't in the cache
+    if Folder is None:
+        Folder = Folder_Cache
+    Path_Cache = Folder + os.sep + Key + '.npy'
+    try:
+        Values = np.load(Path_Cache)
+        os.utime(Path_Cache) #Mark the entry as recently used
+    except (OSError, ValueError): #Not in the cache, or evicted by another process while being read
+        return None
+    return Values
+
+def Save(Key, Values, Folder = None):
+    #Stores the array Values for Key. Call Evict_Cache after saving a group of entries to keep the cache folder within its size limit
+    if Folder is None:
+        Folder = Folder_Cache
+    os.makedirs(Folder, exist_ok = True)
+    Path_Cache = Folder + os.sep + Key + '.npy'
+    GasHPWH_Support.Write_Atomic(Path_Cache, lambda File: np.save(File, np.asarray(Values)))
+
+def Evict_Cache(Folder = None, Max_Size = None):
+    #Deletes the least recently used entries until the cache folder is no larger than Max_Size bytes
+    GasHPWH_DrawProfile_Cache.Evict_Cache(Folder_Cache if Folder is None else Folder, Max_Size_Cache if Max_Size is None else Max_Size)
+
+def Clear_Cache(Folder = None):
+    #Deletes every entry in the cache folder
+    Evict_Cache(Folder, 0)
+
+def Inspect_Cache(Folder = None):
+    #Returns a dataframe with one row per entry, containing its key, size (bytes) and when it was last used, with the most recently used first
+    if Folder is None:
+        Folder = Folder_Cache
+    Entries = []
+    if os.path.isdir(Folder):
+        for Entry in os.scandir(Folder):
+            if Entry.name.endswith('.npy'):
+                Status = Entry.stat()
+                Entries.append({'Key': Entry.name[:-len('.npy')], 'Size (bytes)': Status.st_size, 'Last Used': pd.Timestamp(Status.st_mtime, unit = 's')})
+    Entries = pd.DataFrame(Entries, columns = ['Key', 'Size (bytes)', 'Last Used'])
+    return Entries.sort_values('Last Used', ascending = False, ignore_index = True)
+
+if __name__ == '__main__': #python GasHPWH_RunCache.py inspect, or python GasHPWH_RunCache.py clear
+    Parser = argparse.ArgumentParser(description = 'Inspects or clears the cache of simulation totals')
+    Parser.add_argument('Command', choices = ['inspect', 'clear'], help = 'inspect lists the cached entries, clear deletes them')
+    Parser.add_argument('--folder', default = Folder_Cache, help = 'cache folder, default ' + Folder_Cache)
+    Arguments = Parser.parse_args()
+    Entries = Inspect_Cache(Arguments.folder)
+    if Arguments.Command == 'clear':
+        Clear_Cache(Arguments.folder)
+        print('deleted {0} entries ({1:.1f} MB) from {2}'.format(len(Entries), Entries['Size (bytes)'].sum() / 1024 ** 2, Arguments.folder))
+        sys.exit()
+    print('{0} entries ({1:.1f} MB of {2:.0f} MB) in {3}'.format(len(Entries), Entries['Size (bytes)'].sum() / 1024 ** 2, Max_Size_Cache / 1024 ** 2, Arguments.folder))
+    if len(Entries) > 0:
+        print('most recently used {0}, least recently used {1}'.format(Entries['Last Used'].iloc[0], Entries['Last Used'].iloc[-1]))
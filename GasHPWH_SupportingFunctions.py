@@ -18,9 +18,13 @@ columns selections match those in Big Ladder Software's Elements tool. The user
 can specify whether they want the output to use 'IP' or 'SI' units. The default
 it SI, and this will be returned if any unit selection other than 'IP' is
 passed to the function. If 'IP' is passed, the function will perform
-calculations converting from SI to IP. This function does not save the data
-set, as it's anticipated that the user will pass the result into a different 
-function for further analysis.
+calculations converting from SI to IP. Only the needed columns are parsed,
+with the dtypes listed in Columns_Weather. The result is also saved in
+Folder_Cache_Weather as a .npy file named using a hash of the weather file's
+contents and the unit system, so later calls reading the same weather file
+load it from there instead of parsing it again. Pass Cache = False to always
+parse the weather file. It's anticipated that the user will pass the result
+into a different function for further analysis.
 
 The second function is Temperature_Mains_EnergyPlus. It replicates the mains
 water temperature calculation in EnergyPlus. If the user has an appropriate
@@ -37,15 +41,42 @@ function does not save the data file, leaving the user with the flexibility of
 saving it where they desire. The algorithm has been validated by comparing it 
 to the results for Chicago available in the E+ documentation This function only
 works in IP units as the gas absorption HPWH simulation model is designed to
-accept mains temperature data in deg F.
+accept mains temperature data in deg F. The calculations are performed by
+Mains_Temperature_EnergyPlus, which works on arrays of outdoor temperatures
+for any number of weather stations at once. Temperature_Mains_EnergyPlus_Batch
+uses it to return a (stations x 8760) array of mains temperatures from a list
+of weather files and/or arrays of outdoor temperatures, optionally reading
+the weather files in several processes.
 
 The third function converts an E+ Date/Time column to datetime format. It
 requires an E+ data file as the input and returns the Date/Time column in
 datetime format (Instead of string format). The most efficient way to use
 this function is to set the output of the function to the Date/Time column of
-your file, both converting and saving it in a single step. This function was
-created by Clayton Miller at NUS and can be found at 
+your file, both converting and saving it in a single step. It was originally
+based on a function created by Clayton Miller at NUS, which can be found at 
 https://nbviewer.jupyter.org/github/cmiller8/PythonforBuildingAnalysts/blob/master/2_AnalyzingEnergyPlusOutputFile/EnergyPlusOutFileAnalysis.ipynb#We-need-to-convert-24:00:00-to-00:00:00-for-it-to-play-nice-with-Pandas
+It now parses every timestamp at once using numpy, building each timestamp from
+the start of its day so E+'s 24:00:00 rolls over to the next day. It works
+with hourly and sub-hourly E+ outputs.
+
+The fourth function, Convert_EPlus_Output, combines the previous three to
+convert an EnergyPlus simulation output file and weather file into the inputs
+needed by the gas HPWH model.
+
+The fifth function is Bin_Draw_Profile. It converts an event-based CBECC-Res
+draw profile into the hot water draw volume and inlet water temperature in
+each timestep of the model, for any timestep. Each draw fills the remainder of
+the timestep it starts in, then whole timesteps at its flow rate, then the rest
+of its volume in a final partial timestep. Timesteps without a draw use the
+closest previous mains temperature. It performs the same calculations as the
+loops that used to be repeated in the simulation scripts, but handles every
+draw at once using numpy.
+
+The sixth function, Read_CO2_Multipliers_Electricity, reads the hourly
+electricity CO2 multipliers for every climate zone from a file formatted like
+Data/CO2/CA2019CarbonOnly-Elec.csv and converts them to lb/kWh. The result can
+be passed to GasHPWH_Model.CO2_Electricity to calculate the CO2 production of a
+simulation for every climate zone at once.
 
 Current known issues:
 -None!
@@ -56,44 +87,60 @@ Current known issues:
 #%%---------------------IMPORT STATEMENTS-----------------------------------
 
 import pandas as pd
-import math
 import numpy as np
-import datetime
-from datetime import timedelta
 import time
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+Hours_In_Year = 8760 #The number of hours in a non-leap year
+Days_In_Month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31] #Used to find the month of each hour when only temperatures are provided
+
+#The columns read from E+ weather files, as (position in the file, name, dtype)
+Columns_Weather = [(0, 'Year', 'int64'), (1, 'Month', 'int64'), (2, 'Day', 'int64'), (3, 'Hour', 'int64'), (6, 'Dry Bulb Temperature (deg C)', 'float64'),
+                   (7, 'Dew Point Temperature (deg C)', 'float64'), (8, 'Relative Humidity (%)', 'float64'), (9, 'Atmospheric Pressure (Pa)', 'float64'),
+                   (13, 'Global Solar (Wh/m2)', 'float64'), (14, 'Normal Solar (Wh/m2)', 'float64'), (15, 'Diffuse Solar (Wh/m2)', 'float64'), (21, 'Wind Speed (m/s)', 'float64')]
+Folder_Cache_Weather = os.path.dirname(os.path.abspath(__file__)) + os.sep + 'Data' + os.sep + 'Cache' + os.sep + 'Weather' #Location of the parsed weather files saved by EnergyPlus_Weather_Reader
+Cache_Version_Weather = 1 #Increment when EnergyPlus_Weather_Reader changes, so old cache files are not used
 
 #%%--------------------DEFINE FUNCTIONS-------------------------------------
 
-def EnergyPlus_Weather_Reader(Path, Units): #When calling the function, specify the location of the desired weather file (Path) and the desired final unit system (Units)
-    columns = 'Year', 'Month', 'Day', 'Hour', 'Extra-1', 'Extra-2', 'Dry Bulb Temperature (deg C)', 'Dew Point Temperature (deg C)', 'Relative Humidity (%)', 'Atmospheric Pressure (Pa)', 'Extra-3', 'Extra-4', 'Extra-5', 'Global Solar (Wh/m2)', 'Normal Solar (Wh/m2)', 'Diffuse Solar (Wh/m2)', 'c', 'd', 'e', 'f', 'g', 'Wind Speed (m/s)', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u' #Set the list of column names to use when reading the data file
-    
-    Data = pd.read_csv(Path, names = (columns), skiprows = [0,1,2,3,4,5,6,7]) #Read the data file, assign the column names, and skip the heder information in the first 8 rows
-    
-    #Delete all columns of unnecessary data
-    del Data['Extra-1']
-    del Data['Extra-2']
-    del Data['Extra-3']
-    del Data['Extra-4']
-    del Data['Extra-5']
-    del Data['c']
-    del Data['d']
-    del Data['e']
-    del Data['f']
-    del Data['g']
-    del Data['i']
-    del Data['j']
-    del Data['k']
-    del Data['l']
-    del Data['m']
-    del Data['n']
-    del Data['o']
-    del Data['p']
-    del Data['q']
-    del Data['r']
-    del Data['s']
-    del Data['t']
-    del Data['u']
-    
+def Write_Atomic(Path, Write):
+    #Calls Write with a file opened for writing in binary mode, then moves that file to Path. The file is written under a temporary name first,
+    #so other processes never read a partially written file
+    Path_Temporary = '{0}.{1}.tmp'.format(Path, os.getpid())
+    with open(Path_Temporary, 'wb') as File:
+        Write(File)
+    os.replace(Path_Temporary, Path)
+
+def EnergyPlus_Weather_Reader(Path, Units, Cache = True): #When calling the function, specify the location of the desired weather file (Path) and the desired final unit system (Units)
+    #Only the columns listed in Columns_Weather are parsed. If Cache = True the result is saved in Folder_Cache_Weather the first time a weather
+    #file is read with a given unit system, and later calls load that file instead of parsing the weather file again
+
+    if Cache == True:
+        #The cache file is named by a hash of the weather file's contents. The hash is remembered in a small file named by the weather file's path,
+        #modification time and size, so the contents are only read and hashed again when one of those changes
+        Status = os.stat(Path)
+        Key_File = '{0}|{1}|{2}'.format(os.path.abspath(Path), Status.st_mtime_ns, Status.st_size)
+        Path_Key = Folder_Cache_Weather + os.sep + hashlib.sha1(Key_File.encode()).hexdigest() + '.key'
+        Hash_Contents = None
+        if os.path.exists(Path_Key):
+            with open(Path_Key) as File:
+                Hash_Contents = File.read()
+        if not Hash_Contents:
+            with open(Path, 'rb') as File:
+                Hash_Contents = hashlib.sha1(File.read()).hexdigest()
+            os.makedirs(Folder_Cache_Weather, exist_ok = True)
+            Write_Atomic(Path_Key, lambda File: File.write(Hash_Contents.encode()))
+        Key = '{0}|{1}|{2}'.format(Hash_Contents, 'IP' if Units == 'IP' else 'SI', Cache_Version_Weather) #Any unit selection other than 'IP' returns SI units, so it shares the SI cache file
+        Path_Cache = Folder_Cache_Weather + os.sep + hashlib.sha1(Key.encode()).hexdigest() + '.npy'
+        if os.path.exists(Path_Cache):
+            return pd.DataFrame(np.load(Path_Cache))
+
+    Data = pd.read_csv(Path, header = None, skiprows = 8, usecols = [Position for Position, Name, Type in Columns_Weather],
+                       dtype = {Position: Type for Position, Name, Type in Columns_Weather}) #Read only the needed columns, skipping the header information in the first 8 rows
+    Data.columns = [Name for Position, Name, Type in Columns_Weather] #Assign the column names
+
     #If selected by the user, convert from SI to IP units
     if Units == 'IP':
         Data['Dry Bulb Temperature (deg F)'] = 1.8 * Data['Dry Bulb Temperature (deg C)'] + 32 #Convert from deg C to deg F
@@ -104,60 +151,113 @@ def EnergyPlus_Weather_Reader(Path, Units): #When calling the function, specify
         
         Data['Wind Speed (ft/s)'] = Data['Wind Speed (m/s)'] * 3.28084 #Convert from m/s to ft/s
         del Data['Wind Speed (m/s)'] #Delete the old wind speed column
+
+    if Cache == True:
+        os.makedirs(Folder_Cache_Weather, exist_ok = True)
+        Write_Atomic(Path_Cache, lambda File: np.save(File, Data.to_records(index = False)))
     
     return Data
 
-def Temperature_Mains_EnergyPlus(Data): #Replicate the mains temperature calculations in EnergyPlus
-    
-    Data['Mains Temperature (deg F)'] = 0 #Create a new column in the data set for the mains water temperature. Since it hasn't been calculated yet set all values to 0
-    
-    Average_Outdoor_Temperature = Data['Dry Bulb Temperature (deg F)'].mean() #Calculate the average outdoor temperature over the year
+def Mains_Temperature_EnergyPlus(Temperature_Outdoor, Month):
+    #Calculates the E+ mains water temperature for any number of weather stations at once. Temperature_Outdoor is a (stations x hours) array of
+    #hourly outdoor dry bulb temperatures in deg F, starting at midnight on Jan 1. Month is the month of each hour, either shared by every
+    #station (hours) or specified for each (stations x hours). A single station can also be passed as 1-dimensional arrays
+    #Returns a (stations x hours) array of mains water temperatures in deg F
+    Temperature_Outdoor = np.atleast_2d(np.asarray(Temperature_Outdoor, dtype = float))
+    Stations, Hours = Temperature_Outdoor.shape
+    Month = np.broadcast_to(np.asarray(Month, dtype = int), (Stations, Hours))
+
+    Average_Outdoor_Temperature = Temperature_Outdoor.mean(axis = 1) #Calculate the average outdoor temperature over the year
     ratio = 0.4 + 0.01 * (Average_Outdoor_Temperature - 44) #Calculate the ratio used in the E+ algorithm
     lag = 35 - 1 * (Average_Outdoor_Temperature - 44) #Calculate the lag used in the E+ algorithm
-    Maximum_Difference_Monthly_Average_Outdoor_Temperatures = Data.groupby('Month')['Dry Bulb Temperature (deg F)'].mean().max() - Data.groupby('Month')['Dry Bulb Temperature (deg F)'].mean().min() #Calculate the maximum difference in monthly average out door temperatures
-    
+
+    Index_Month = (np.arange(Stations)[:, np.newaxis] * 13 + Month).ravel() #Each station's months get their own bins, so every monthly average is found in one bincount
+    Count_Month = np.bincount(Index_Month, minlength = Stations * 13).reshape(Stations, 13)
+    Sum_Month = np.bincount(Index_Month, weights = Temperature_Outdoor.ravel(), minlength = Stations * 13).reshape(Stations, 13)
+    Average_Monthly = np.where(Count_Month > 0, Sum_Month / np.maximum(Count_Month, 1), np.nan)
+    Maximum_Difference_Monthly_Average_Outdoor_Temperatures = np.nanmax(Average_Monthly, axis = 1) - np.nanmin(Average_Monthly, axis = 1) #Calculate the maximum difference in monthly average outdoor temperatures
+
+    Day = np.floor(np.arange(Hours) / 24 + 1) #The day of the year for each hour
+    return ((Average_Outdoor_Temperature + 6)[:, np.newaxis] + (ratio * Maximum_Difference_Monthly_Average_Outdoor_Temperatures / 2)[:, np.newaxis]
+            * np.sin((0.986 * (Day - 15 - lag[:, np.newaxis]) - 90) * np.pi / 180))
+
+def Temperature_Mains_EnergyPlus(Data): #Replicate the mains temperature calculations in EnergyPlus
+
     Data['Day of Year (Day)'] = np.floor(Data.index/24 + 1) #Add a new column representing the day of the year for each row
-    
-    for i in range(0, len(Data)):
-        Data.loc[i, 'Mains Water Temperature (deg F)'] = (Average_Outdoor_Temperature + 6) + ratio * (Maximum_Difference_Monthly_Average_Outdoor_Temperatures/2) * math.sin((0.986 * (Data.loc[i, 'Day of Year (Day)'] - 15 - lag) - 90) * math.pi/180) #Calculate the mains temperature for each day and add it to the data set
-    
+    Data['Mains Water Temperature (deg F)'] = Mains_Temperature_EnergyPlus(Data['Dry Bulb Temperature (deg F)'].to_numpy(), Data['Month'].to_numpy())[0] #Calculate the mains temperature for each day and add it to the data set
     Data['Hour of Year (hr)'] = Data.index #Add a new column representing the hour of the year for each row
-    
+
     return Data
 
-def eplustimestamp(simdata):
-    timestampdict={}
-    for i,row in simdata.T.iteritems():
-        timestamp = str(2013) + row['Date/Time']
-        try:
-            timestampdict[i] = datetime.datetime.strptime(timestamp,'%Y %m/%d  %H:%M:%S')
-        except ValueError:
-            tempts = timestamp.replace(' 24', ' 23')
-            timestampdict[i] = datetime.datetime.strptime(tempts,'%Y %m/%d  %H:%M:%S')
-            timestampdict[i] += timedelta(hours=1)
-    timestampseries = pd.Series(timestampdict)
-    return timestampseries
+def _Read_Temperature_Outdoor(Path):
+    #Returns the hourly outdoor dry bulb temperature (deg F) and month of each hour in the E+ weather file at Path. Used by
+    #Temperature_Mains_EnergyPlus_Batch, and defined at the module level so it can be sent to worker processes
+    Data = EnergyPlus_Weather_Reader(Path, 'IP')
+    return Data['Dry Bulb Temperature (deg F)'].to_numpy(dtype = float), Data['Month'].to_numpy(dtype = int)
+
+def Temperature_Mains_EnergyPlus_Batch(Weather, Workers = 1):
+    #Calculates the E+ mains water temperature for many weather stations in one call. Each entry in Weather is either the path to an E+ weather
+    #file or an array of hourly outdoor dry bulb temperatures in deg F starting at midnight on Jan 1, in which case the months are assumed to
+    #follow a non-leap year. Every station must have the same number of hours
+    #Workers is the number of processes used to read the weather files. Enter None to use one per CPU
+    #Returns a (stations x hours) array of mains water temperatures in deg F, in the same order as Weather
+    if Workers is None:
+        Workers = os.cpu_count()
+    Paths = [Station for Station in Weather if isinstance(Station, str)]
+    if Workers == 1 or len(Paths) <= 1:
+        Read = list(map(_Read_Temperature_Outdoor, Paths))
+    else:
+        with ProcessPoolExecutor(max_workers = min(Workers, len(Paths))) as Pool:
+            Read = list(Pool.map(_Read_Temperature_Outdoor, Paths))
+    Read = iter(Read)
+
+    Temperatures, Months = [], []
+    for Station in Weather:
+        if isinstance(Station, str):
+            Temperature, Month = next(Read)
+        else:
+            Temperature = np.asarray(Station, dtype = float)
+            Month = np.repeat(np.arange(1, 13), np.array(Days_In_Month) * 24)[np.minimum(np.arange(len(Temperature)), Hours_In_Year - 1)]
+        Temperatures.append(Temperature)
+        Months.append(Month)
+    if len(set(len(Temperature) for Temperature in Temperatures)) > 1:
+        raise ValueError('Every station passed to Temperature_Mains_EnergyPlus_Batch must have the same number of hours')
+    return Mains_Temperature_EnergyPlus(np.vstack(Temperatures), np.vstack(Months))
+
+def eplustimestamp(simdata, Year = 2013):
+    #Parses every E+ Date/Time string (' MM/DD  HH:MM:SS') at once. E+ reports the end of each day as 24:00:00, which datetime can't parse, so
+    #the timestamps are built by adding the time of day to the start of each day instead. This rolls 24:00:00 over to midnight of the next day
+    #and works for hourly and sub-hourly reporting frequencies
+    Strings = simdata['Date/Time'].str.strip()
+    Characters = Strings.to_numpy(dtype = 'U15').view(np.uint32).reshape(-1, 15).astype(np.int64) - ord('0') if len(Strings) > 0 else np.zeros((0, 15), dtype = np.int64)
+    if (Strings.str.len() == 15).all() and (Characters[:, [2, 5, 6, 9, 12]] == np.array([ord(Separator) for Separator in '/  ::']) - ord('0')).all():
+        Month, Day, Hour, Minute, Second = [Characters[:, Position] * 10 + Characters[:, Position + 1] for Position in [0, 3, 7, 10, 13]] #Every timestamp uses the standard layout, so the digits are read directly from their positions
+    else:
+        Month, Day, Hour, Minute, Second = Strings.str.extract(r'(\d+)/(\d+)\s+(\d+):(\d+):(\d+)').to_numpy(dtype = np.int64).T
+    Start_Month = (np.array([np.datetime64('{0}-{1:02d}'.format(Year, Month_Year), 'D') for Month_Year in range(1, 13)])).astype('datetime64[s]') #The first day of each month
+    timestampseries = Start_Month[Month - 1] + ((Day - 1) * 86400 + Hour * 3600 + Minute * 60 + Second).astype('timedelta64[s]')
+    return pd.Series(timestampseries.astype('datetime64[ns]'), index = simdata.index)
 
 def Convert_EPlus_Output(Simulation_Data_Path, Weather_Data_Path, Units):
     Weather_Data = EnergyPlus_Weather_Reader(Weather_Data_Path, Units)
     
     Simulation_Data = pd.read_csv(Simulation_Data_Path)
     Simulation_Data['Date/Time'] = eplustimestamp(Simulation_Data)
-    Simulation_Data['Time (hr)'] = Simulation_Data['Date/Time'].dt.hour
 
-    Simulation_Data['Timestep (min)'] = (Simulation_Data['Time (hr)'] - Simulation_Data['Time (hr)'].shift()).fillna(0) * 60
-    Simulation_Data.loc[Simulation_Data['Time (hr)'] == 0, 'Timestep (min)'] = (24 - Simulation_Data['Time (hr)'].shift()) * 60
+    Simulation_Data['Timestep (min)'] = (Simulation_Data['Date/Time'].diff().dt.total_seconds() / 60).fillna(0) #The reporting frequency can be hourly or sub-hourly
 
     Simulation_Data['Time (min)'] = Simulation_Data['Timestep (min)'].cumsum()
     Simulation_Data['Hour of Year (hr)'] = (Simulation_Data['Time (min)'] / 60).astype(int)
 
-    Simulation_Data['Inlet Water Temperature (deg F)'] = Temperature_Mains_EnergyPlus(Weather_Data)['Mains Water Temperature (deg F)']
+    Mains_Temperature = Temperature_Mains_EnergyPlus(Weather_Data)['Mains Water Temperature (deg F)'].to_numpy()
+    Simulation_Data['Inlet Water Temperature (deg F)'] = Mains_Temperature[np.minimum(Simulation_Data['Hour of Year (hr)'].to_numpy(), len(Mains_Temperature) - 1)]
     
     Density_Water = 8.3176 #lb-m/gal @ 80 deg F, http://www.engineeringtoolbox.com/water-density-specific-weight-d_595.html
     Pounds_In_Kilogram = 2.20462 #The number of pounds in a kilogram (Unit conversion)
     Seconds_In_Minute = 60 #The number of seconds in a minute (Unit conversion)
     
-    Simulation_Data['Hot Water Draw Volume (gal)'] = Simulation_Data['WATER HEATER_1:Water Heater Use Side Mass Flow Rate [kg/s](Hourly)'] * Seconds_In_Minute * Pounds_In_Kilogram / Density_Water * Simulation_Data['Timestep (min)']
+    Column_Flow = [Column for Column in Simulation_Data.columns if Column.startswith('WATER HEATER_1:Water Heater Use Side Mass Flow Rate [kg/s]')][0] #Ends in the reporting frequency, such as (Hourly) or (TimeStep)
+    Simulation_Data['Hot Water Draw Volume (gal)'] = Simulation_Data[Column_Flow] * Seconds_In_Minute * Pounds_In_Kilogram / Density_Water * Simulation_Data['Timestep (min)']
     
     Simulation_Data_Output = pd.DataFrame()
     Simulation_Data_Output['Hour of Year (hr)'] = Simulation_Data['Hour of Year (hr)']
@@ -166,4 +266,58 @@ def Convert_EPlus_Output(Simulation_Data_Path, Weather_Data_Path, Units):
     Simulation_Data_Output['Inlet Water Temperature (deg F)'] = Simulation_Data['Inlet Water Temperature (deg F)']
     Simulation_Data_Output['Hot Water Draw Volume (gal)'] = Simulation_Data['Hot Water Draw Volume (gal)']
     
-    return Simulation_Data_Output
\ No newline at end of file
+    return Simulation_Data_Output
+
+def Bin_Draw_Profile(Draw_Profile, Timestep, Length = None):
+    #Converts an event-based CBECC-Res draw profile into the hot water draw volume and inlet water temperature in each timestep of the model.
+    #Every draw is handled at once using numpy, instead of stepping through each draw and each bin it covers
+    #Draw_Profile is a dataframe with the columns of the CBECC-Res draw profiles, Timestep is the model timestep in minutes and Length is the number
+    #of timesteps in the model. If Length is not provided it covers every day from the first to the last day in the draw profile
+    #Returns two arrays, containing the draw volume (gal) and inlet temperature (deg F) in each timestep
+    
+    Minutes_In_Day = 1440 #The number of minutes in a day
+    
+    Day = Draw_Profile['Day of Year (Day)'].to_numpy().astype(int) #make sure the days are in integer format, not float
+    if Length is None:
+        Length = int((Day.max() - Day.min() + 1) * Minutes_In_Day / Timestep) #The number of timestep bins covered by the draw profile
+    Start_Time = Draw_Profile['Start time (hr)'].to_numpy() * 60 + (Day - Day[0]) * Minutes_In_Day #Starting time of each draw relative to the first day of the draw profile, in minutes
+    Flow_Rate = Draw_Profile['Hot Water Flow Rate (gpm)'].to_numpy(dtype = float)
+    Duration = Draw_Profile['Duration (min)'].to_numpy(dtype = float)
+    Temperature_Mains = Draw_Profile['Mains Temperature (deg F)'].to_numpy(dtype = float)
+    
+    #Each draw fills part of its first bin, then whole bins at Flow_Rate * Timestep, then whatever water remains in its last bin
+    Bin_Start = np.floor(Start_Time/Timestep).astype(int) #The model timestep bin when each draw starts, 0 indexed
+    Time_First_Bin = np.minimum((Bin_Start + 1) * Timestep - Start_Time, Duration) #Flow time in the first bin, limited to the duration of the draw if it only occurs in one bin
+    Time_Remaining = Duration - Time_First_Bin #Flow time after the first bin
+    Bins_Full = np.floor(Time_Remaining / Timestep).astype(int) #Number of whole bins after the first bin
+    Volume_Last = Flow_Rate * (Time_Remaining - Bins_Full * Timestep) #Water remaining for the partial last bin
+    Has_Draw = Flow_Rate * Duration > 0 #Draws with no water don't fill any bins
+    Bins_Draw = np.where(Has_Draw, 1 + Bins_Full + (Volume_Last > 1e-12 * Flow_Rate * Duration), 0) #Number of bins covered by each draw. Ignores remainders caused by rounding errors
+    
+    Draw = np.repeat(np.arange(len(Bin_Start)), Bins_Draw) #The draw covering each bin, in the order of the draw profile
+    Offset = np.arange(len(Draw)) - np.repeat(np.cumsum(Bins_Draw) - Bins_Draw, Bins_Draw) #Position of each bin within its draw
+    Bin = Bin_Start[Draw] + Offset
+    Volume_Bin = np.where(Offset == 0, Flow_Rate[Draw] * Time_First_Bin[Draw], np.where(Offset <= Bins_Full[Draw], Flow_Rate[Draw] * Timestep, Volume_Last[Draw]))
+    In_Model = (Bin >= 0) & (Bin < Length) #Water drawn outside of the simulated period is not included
+    Bin, Draw, Volume_Bin = Bin[In_Model], Draw[In_Model], Volume_Bin[In_Model]
+    
+    Volume = np.bincount(Bin, weights = Volume_Bin, minlength = Length)
+    Inlet = np.zeros(Length)
+    Bin_Last, Index_Last = np.unique(Bin[::-1], return_index = True) #When draws overlap, the bin takes the mains temperature of the last draw in the draw profile
+    Inlet[Bin_Last] = Temperature_Mains[Draw[::-1][Index_Last]]
+    Inlet = pd.Series(Inlet).replace(0, np.nan).ffill().bfill().fillna(0).to_numpy() #Timesteps without a draw use the closest previous mains temperature, or the closest subsequent one at the start of the profile
+    
+    return Volume, Inlet
+
+def Read_CO2_Multipliers_Electricity(Path):
+    #Reads the hourly electricity CO2 multipliers in a file formatted like Data/CO2/CA2019CarbonOnly-Elec.csv, with a column of ton/MWh values for
+    #each climate zone below two lines of notes
+    #Returns an (8760 x climate zones) dataframe in lb/kWh, with columns named 'CZ1', 'CZ2', etc., ready to pass to GasHPWH_Model.CO2_Electricity
+    
+    Pounds_In_Ton = 2000 #Pounds / US ton
+    kWh_In_MWh = 1000 #kWh in MWh
+    
+    CO2_Elec = pd.read_csv(Path, header = 2) #The header declaration is specific to the current file, and may need to be changed when using different files
+    CO2_Elec = CO2_Elec[[Column for Column in CO2_Elec.columns if Column.startswith('CZ')]] #Removes the date column
+    CO2_Elec.columns = [Column.split(' ')[0] for Column in CO2_Elec.columns] #'CZ1 Electricity Long-Run Carbon Emission Factors (ton/MWh)' becomes 'CZ1'
+    return CO2_Elec * Pounds_In_Ton / kWh_In_MWh
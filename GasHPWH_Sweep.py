@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 08:40:00 2020
+
+This module runs the gas HPWH model for many CBECC-Res draw profiles, optionally spreading the simulations across several processes.
+Run_Draw_Profiles runs a list of simulations, and Run_Sweep runs a parametric study of the gas HPWH design with every combination of inputs
+in a grid. Totals of simulations that don't save their full results are cached using GasHPWH_RunCache, and an interrupted run can continue
+where it left off using GasHPWH_Journal.
+
+@author: Peter Grant
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import GasHPWH_Model as GasHPWH
+import GasHPWH_DrawProfile_Cache
+import GasHPWH_DrawProfile_Catalog
+import GasHPWH_Ambient
+import GasHPWH_ResultStore
+import GasHPWH_RunCache
+import GasHPWH_Journal
+
+Columns_Summary = ['Electricity (kWh)', 'Gas (therms)', 'CO2 Production Gas (lb)', 'CO2 Production Elec (lb)'] #The annual totals returned for each simulation
+
+def Create_Model(Path_DrawProfile, Timestep, Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet = None, Path_Weather = None, Fraction_Outdoor = 1):
+    #Returns the dataframe used to simulate the draw profile at Path_DrawProfile. The inlet water temperature is taken from the draw profile
+    #unless Temperature_Water_Inlet is provided. If Path_Weather is provided the ambient temperature is Fraction_Outdoor * the outdoor temperature
+    #in that E+ weather file + (1 - Fraction_Outdoor) * Temperature_Ambient, otherwise it's Temperature_Ambient
+    Binned_Draw_Profile = GasHPWH_DrawProfile_Cache.Load_Binned_Draw_Profile(Path_DrawProfile, Timestep) #Each draw spread across the timestep bins it covers, with the inlet water temperature in each bin
+    Model = pd.DataFrame(index = range(len(Binned_Draw_Profile))) #Creates a data frame with 1 row for each bin in the draw profile
+    Model['Time (min)'] = Model.index * Timestep #Create a column in the data frame giving the time at the beginning of each timestep bin
+    Model['Hot Water Draw Volume (gal)'] = Binned_Draw_Profile['Hot Water Draw Volume (gal)']
+    if Temperature_Water_Inlet is None:
+        Model['Inlet Water Temperature (deg F)'] = Binned_Draw_Profile['Inlet Water Temperature (deg F)'] #Inlet temperature from the draw profile, with timesteps without draws using the closest previous value
+    else:
+        Model['Inlet Water Temperature (deg F)'] = Temperature_Water_Inlet
+    Model['Ambient Temperature (deg F)'] = Ambient_Temperature(len(Binned_Draw_Profile), Timestep, Temperature_Ambient, Path_Weather, Fraction_Outdoor)
+
+    # Initializes a bunch of values at either 0 or initial temperature. They will be overwritten later as needed
+    Model['Tank Temperature (deg F)'] = 0
+    Model.loc[0, 'Tank Temperature (deg F)'] = Temperature_Tank_Initial
+    Model.loc[1, 'Tank Temperature (deg F)'] = Temperature_Tank_Initial
+    Model['Jacket Losses (Btu)'] = 0
+    Model['Energy Withdrawn (Btu)'] = 0
+    Model['Energy Added Backup (Btu)'] = 0
+    Model['Energy Added Heat Pump (Btu)'] = 0
+    Model['Energy Added Total (Btu)'] = 0
+    Model['COP Gas'] = 0
+    Model['Total Energy Change (Btu)'] = 0
+    Model['Timestep (min)'] = Timestep
+    Model['CO2 Production (lb)'] = 0
+    Model['Hour of Year (hr)'] = Binned_Draw_Profile['Hour of Year (hr)']
+    Model['Electricity CO2 Multiplier (lb/kWh)'] = 0
+    return Model
+
+def Ambient_Temperature(Length, Timestep, Temperature_Ambient, Path_Weather = None, Fraction_Outdoor = 1):
+    #Returns the ambient temperature in each timestep of a simulation, as described in Create_Model
+    if Path_Weather is None:
+        return Temperature_Ambient
+    return GasHPWH_Ambient.Temperature_Ambient(Path_Weather, Timestep, Length, Fraction_Outdoor, Temperature_Ambient)
+
+def Summarize_Model(Model):
+    #Returns the annual totals of a completed simulation
+    return {'Electricity (kWh)': Model['Electric Usage (W-hrs)'].sum()/1000,
+            'Gas (therms)': Model['Gas Usage (Btu)'].sum()/100000,
+            'CO2 Production Gas (lb)': Model['CO2 Production Gas (lb)'].sum(),
+            'CO2 Production Elec (lb)': Model['CO2 Production Elec (lb)'].sum()}
+
+def Simulate_Draw_Profile(Job, Timestep, Regression_COP, Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet = None, CO2_Multipliers = None,
+                          Path_Weather = None, Fraction_Outdoor = 1, Cache = None):
+    #Simulates one draw profile and returns its annual totals. Job is a tuple of (Path_DrawProfile, Parameters, Path_Output)
+    #When the full results aren't saved the model dataframe is never created, and the totals are calculated by Simulate_Totals instead, using the
+    #cache of simulation totals unless Cache = False
+    Path_DrawProfile, Parameters, Path_Output = Job
+    if Path_Output is None:
+        if not isinstance(Parameters, GasHPWH.GasHPWH_Parameters):
+            Parameters = GasHPWH.GasHPWH_Parameters(*Parameters)
+        Inputs = Simulation_Inputs(Path_DrawProfile, Timestep, Temperature_Ambient, Temperature_Water_Inlet, Path_Weather, Fraction_Outdoor)
+        Totals, Hourly_Electricity = Simulate_Totals(Inputs, [Parameters], Regression_COP, Temperature_Tank_Initial, Hourly = CO2_Multipliers is not None,
+                                                     Cache = Cache)
+        Summary = Totals.iloc[0].to_dict()
+        Hourly_Electricity = None if Hourly_Electricity is None else Hourly_Electricity[0]
+    else:
+        Model = Create_Model(Path_DrawProfile, Timestep, Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet, Path_Weather, Fraction_Outdoor)
+        Model = GasHPWH.Model_GasHPWH_MixedTank(Model, Parameters, Regression_COP)
+        if Path_Output.endswith('.npz'):
+            Metadata = {'Draw Profile': os.path.basename(Path_DrawProfile), 'Timestep (min)': Timestep}
+            if isinstance(Parameters, GasHPWH.GasHPWH_Parameters):
+                Metadata.update({Name: Value for Name, Value in zip(Parameters._fields[0:12], Parameters[0:12])}, Parameters = Parameters.Hash())
+            GasHPWH_ResultStore.Write_Run_Background(Path_Output, Model, Metadata)
+        else:
+            Model.to_csv(Path_Output, index = False)
+        Summary = Summarize_Model(Model)
+        Hourly_Electricity = GasHPWH.Hourly_Electricity(Model)
+    if CO2_Multipliers is not None:
+        for Column, CO2 in GasHPWH.CO2_Electricity(Hourly_Electricity, CO2_Multipliers).items():
+            Summary['CO2 Production Elec {0} (lb)'.format(Column)] = CO2
+    return Summary
+
+def Run_Jobs(Simulate, Jobs, Names, Workers = 1, Path_Journal = None, Keys = None, Outputs = None):
+    #Calls Simulate with each job in Jobs and returns a list of the results in the same order as Jobs. Workers is the number of processes to use
+    #Names is the name of each job, printed when it finishes along with the number of jobs finished per second and the estimated time remaining
+    #If Path_Journal is provided each result is appended to that journal as soon as it's finished (See GasHPWH_Journal), identified by the entry
+    #of Keys for its job. Jobs whose keys are already in the journal are not run again, unless the entry of Outputs for the job (The file it
+    #saves, or None) is missing
+    Results = [None] * len(Jobs)
+    Pending = list(range(len(Jobs)))
+    Journal = None
+    if Path_Journal is not None:
+        Completed, Journal = GasHPWH_Journal.Open_Journal(Path_Journal)
+        for Index, Key in enumerate(Keys):
+            if Key in Completed and (Outputs is None or Outputs[Index] is None or os.path.exists(Outputs[Index])):
+                Results[Index] = Completed[Key]
+        Pending = [Index for Index in Pending if Results[Index] is None]
+        if len(Pending) < len(Jobs):
+            print('{0}/{1} already finished in {2}'.format(len(Jobs) - len(Pending), len(Jobs), Path_Journal))
+
+    Start = time.time()
+    if Workers == 1 or len(Pending) <= 1:
+        Finished = ((Index, Simulate(Jobs[Index])) for Index in Pending)
+        Pool = None
+    else:
+        Pool = ProcessPoolExecutor(max_workers = min(Workers, len(Pending)))
+        Futures = {Pool.submit(Simulate, Jobs[Index]): Index for Index in Pending}
+        Finished = ((Futures[Future], Future.result()) for Future in as_completed(Futures)) #Each job as soon as it finishes, so it's journaled right away
+    try:
+        for Count, (Index, Result) in enumerate(Finished, 1):
+            Results[Index] = Result
+            if Journal is not None:
+                GasHPWH_Journal.Append(Journal, Keys[Index], Result)
+            Elapsed = time.time() - Start
+            print('{0}/{1} {2} finished after {3:.1f} seconds, {4}'.format(len(Jobs) - len(Pending) + Count, len(Jobs), Names[Index], Elapsed,
+                                                                        GasHPWH_Journal.Progress(Count, len(Pending) - Count, Elapsed)))
+    finally:
+        if Pool is not None:
+            for Future in Futures: #Jobs that haven't started yet if the run was stopped
+                Future.cancel()
+            Pool.shutdown() #Also waits for each worker to finish writing its full results
+        GasHPWH_ResultStore.Wait()
+        if Journal is not None:
+            Journal.close()
+    return Results
+
+def Run_Draw_Profiles(Jobs, Timestep, Regression_COP, Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet = None, Workers = 1, CO2_Multipliers = None,
+                      Path_Weather = None, Fraction_Outdoor = 1, Cache = None, Path_Journal = None):
+    #Runs every simulation in Jobs and returns a dataframe of their annual totals, with one row per job in the same order as Jobs
+    #Each job is a tuple of the path to the draw profile, the parameters of the gas HPWH (Usually a GasHPWH_Parameters) and the path to save the
+    #full results to, or None to not save them. Full results are saved as a csv file, or with GasHPWH_ResultStore if the path ends with .npz
+    #Workers is the number of processes to use. Enter None to use one per CPU. Each worker imports the calling script on Windows and macOS, so
+    #the call must be inside an if __name__ == '__main__': block
+    #CO2_Multipliers is an optional (8760 x sets) dataframe of hourly electricity CO2 multipliers (lb/kWh), each of which is applied to every simulation
+    #Path_Weather and Fraction_Outdoor optionally set a time-varying ambient temperature, as described in Create_Model
+    #Cache = True/False uses or ignores the cache of simulation totals for jobs that don't save their full results. None uses GasHPWH_RunCache.Use_Cache
+    #Path_Journal is an optional journal file, which records each finished simulation so an interrupted run continues where it left off
+    if Workers is None:
+        Workers = os.cpu_count()
+    Simulate = partial(Simulate_Draw_Profile, Timestep = Timestep, Regression_COP = Regression_COP, Temperature_Tank_Initial = Temperature_Tank_Initial,
+                       Temperature_Ambient = Temperature_Ambient, Temperature_Water_Inlet = Temperature_Water_Inlet, CO2_Multipliers = CO2_Multipliers,
+                       Path_Weather = Path_Weather, Fraction_Outdoor = Fraction_Outdoor, Cache = Cache)
+    Settings = GasHPWH_Journal.Key_Job('Run_Draw_Profiles', GasHPWH_RunCache.Cache_Version, GasHPWH_RunCache.Hash_Model(), Timestep, Regression_COP,
+                                       Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet, CO2_Multipliers, Path_Weather, Fraction_Outdoor)
+    Keys = [GasHPWH_Journal.Key_Job(Settings, GasHPWH_DrawProfile_Cache.Key_Cache(Path_DrawProfile, Timestep), Parameters if isinstance(Parameters, GasHPWH.GasHPWH_Parameters) else
+                                    GasHPWH.GasHPWH_Parameters(*Parameters), Path_Output) for Path_DrawProfile, Parameters, Path_Output in Jobs]
+    Results = Run_Jobs(Simulate, Jobs, [os.path.basename(Job[0]) for Job in Jobs], Workers, Path_Journal, Keys, [Job[2] for Job in Jobs])
+    if GasHPWH_RunCache.Use_Cache if Cache is None else Cache:
+        GasHPWH_RunCache.Evict_Cache() #Once per run, instead of after every simulation
+
+    Columns_CO2 = [] if CO2_Multipliers is None else ['CO2 Production Elec {0} (lb)'.format(Column) for Column in CO2_Multipliers.columns]
+    return pd.DataFrame(Results, columns = Columns_Summary + Columns_CO2)
+
+def Combinations(Grid):
+    #Returns the list of input combinations described by Grid, each as a dictionary. A dictionary of lists is expanded into every combination of
+    #their values, with the last name varying fastest. A list of dictionaries is returned as is
+    if isinstance(Grid, dict):
+        Values = [list(Value) if isinstance(Value, (list, tuple, set, range, np.ndarray, pd.Series)) else [Value] for Value in Grid.values()]
+        return [dict(zip(Grid.keys(), Combination)) for Combination in itertools.product(*Values)]
+    return [dict(Combination) for Combination in Grid]
+
+def Simulation_Inputs(Path_DrawProfile, Timestep, Temperature_Ambient, Temperature_Water_Inlet = None, Path_Weather = None, Fraction_Outdoor = 1):
+    #Returns a dictionary of the input arrays of Model_GasHPWH_MixedTank_Summary for the draw profile at Path_DrawProfile (Draw, Inlet, Ambient,
+    #Time, Timestep and Hour), and the hash of those arrays used by the cache of simulation totals
+    Binned_Draw_Profile = GasHPWH_DrawProfile_Cache.Load_Binned_Draw_Profile(Path_DrawProfile, Timestep)
+    Length = len(Binned_Draw_Profile)
+    Inputs = {'Draw': np.asarray(Binned_Draw_Profile['Hot Water Draw Volume (gal)'], dtype = float),
+              'Inlet': np.asarray(Binned_Draw_Profile['Inlet Water Temperature (deg F)'] if Temperature_Water_Inlet is None else Temperature_Water_Inlet, dtype = float),
+              'Ambient': np.asarray(Ambient_Temperature(Length, Timestep, Temperature_Ambient, Path_Weather, Fraction_Outdoor), dtype = float),
+              'Time': np.arange(Length) * Timestep,
+              'Timestep': Timestep,
+              'Hour': np.asarray(Binned_Draw_Profile['Hour of Year (hr)'], dtype = float)}
+    Inputs['Hash'] = GasHPWH_RunCache.Hash_Arrays(Inputs['Draw'], Inputs['Inlet'], Inputs['Ambient'], Inputs['Time'], float(Timestep), Inputs['Hour'])
+    return Inputs
+
+def Simulate_Totals(Inputs, Parameters, Regression_COP, Temperature_Tank_Initial, Hourly = False, Compiled = None, Cache = None):
+    #Simulates the inputs returned by Simulation_Inputs with every GasHPWH_Parameters in the list Parameters. Returns a dataframe of the annual
+    #totals in Columns_Summary with one row per set, and a (sets x 8760) array of the hourly electricity use (kWh) if Hourly = True, otherwise None
+    #Compiled = True/False selects one simulation per set with the compiled Model_GasHPWH_MixedTank_Summary, or every set at once with
+    #Model_GasHPWH_MixedTank_Batch. None uses the compiled model if it's available
+    #Sets found in the cache of simulation totals aren't simulated again, unless Cache = False. None uses GasHPWH_RunCache.Use_Cache
+    #New entries are saved without evicting old ones. Call GasHPWH_RunCache.Evict_Cache once the whole run is finished
+    if Compiled is None:
+        Compiled = GasHPWH.Use_Compiled_Kernel and GasHPWH.Numba_Available
+    if Cache is None:
+        Cache = GasHPWH_RunCache.Use_Cache
+    Values = [None] * len(Parameters) #The annual totals of each set, followed by its hourly electricity use if Hourly = True
+    if Cache:
+        Keys = [GasHPWH_RunCache.Key_Run('Model_GasHPWH_MixedTank_Summary', Inputs['Hash'], Parameters_Set, Regression_COP, Temperature_Tank_Initial, Hourly)
+                for Parameters_Set in Parameters]
+        Values = [GasHPWH_RunCache.Load(Key) for Key in Keys]
+    Missing = [Index for Index, Value in enumerate(Values) if Value is None]
+
+    if Missing:
+        Arguments = (Inputs['Draw'], Inputs['Inlet'], Inputs['Ambient'], Inputs['Time'], Inputs['Timestep'])
+        if Compiled or len(Missing) == 1:
+            Results = [GasHPWH.Model_GasHPWH_MixedTank_Summary(*Arguments, Parameters[Index], Regression_COP, Temperature_Tank_Initial, Hour = Inputs['Hour'],
+                                                               Hourly = Hourly, Compiled = Compiled) for Index in Missing]
+            Totals = pd.DataFrame([Result.Annual for Result in Results])
+            Hourly_Electricity = [Result.Hourly['Electricity (kWh)'].to_numpy() for Result in Results] if Hourly else None
+        else:
+            Results = GasHPWH.Model_GasHPWH_MixedTank_Batch(*Arguments, [Parameters[Index] for Index in Missing], Regression_COP, Temperature_Tank_Initial,
+                                                            Hour = Inputs['Hour'], Hourly = Hourly)
+            Totals, Hourly_Electricity = Results if Hourly else (Results, None)
+        Totals = Totals[Columns_Summary].to_numpy(dtype = float)
+        for Position, Index in enumerate(Missing):
+            Values[Index] = np.concatenate([Totals[Position], Hourly_Electricity[Position]]) if Hourly else Totals[Position]
+            if Cache:
+                GasHPWH_RunCache.Save(Keys[Index], Values[Index])
+
+    Values = np.array(Values, dtype = float).reshape(len(Parameters), -1)
+    Totals = pd.DataFrame(Values[:, 0:len(Columns_Summary)], columns = Columns_Summary)
+    return Totals, (Values[:, len(Columns_Summary):] if Hourly else None)
+
+def Simulate_Sweep_Profile(Path_DrawProfile, Parameters, Timestep, Regression_COP, Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet = None,
+                           CO2_Multipliers = None, Path_Weather = None, Fraction_Outdoor = 1, Compiled = None, Cache = None):
+    #Simulates the draw profile at Path_DrawProfile with every set of parameters in the list Parameters, and returns a dataframe of their annual
+    #totals with one row per set. The binned draw profile and the ambient temperature are prepared once and shared by every simulation
+    #Compiled and Cache are passed to Simulate_Totals
+    Inputs = Simulation_Inputs(Path_DrawProfile, Timestep, Temperature_Ambient, Temperature_Water_Inlet, Path_Weather, Fraction_Outdoor)
+    Hourly = CO2_Multipliers is not None
+    Totals, Hourly_Electricity = Simulate_Totals(Inputs, list(Parameters), Regression_COP, Temperature_Tank_Initial, Hourly = Hourly, Compiled = Compiled,
+                                                 Cache = Cache)
+    if Hourly:
+        CO2 = pd.DataFrame(GasHPWH.CO2_Electricity(Hourly_Electricity, CO2_Multipliers))
+        for Column in CO2_Multipliers.columns:
+            Totals['CO2 Production Elec {0} (lb)'.format(Column)] = CO2[Column].to_numpy()
+    return Totals
+
+def Run_Sweep(Grid, Draw_Profiles, Inputs, Timestep, Regression_COP, Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet = None, Workers = 1,
+              CO2_Multipliers = None, Path_Weather = None, Fraction_Outdoor = 1, Path_Output = None, Cache = None, Path_Journal = None):
+    #Simulates every combination of inputs in Grid with every draw profile in Draw_Profiles and returns a table of the results, with one row per
+    #draw profile and combination
+    #Grid is either a dictionary of lists of values, every combination of which is simulated (e.g. {'Volume_Tank': [40, 50, 65]}), or a list of
+    #dictionaries with one per combination. The names are the arguments of GasHPWH_Parameters.From_Inputs
+    #Draw_Profiles is either a list of paths or rows of the draw profile catalog (Such as the result of GasHPWH_DrawProfile_Catalog.Query), in
+    #which case the fields of each file name are added to the table
+    #Inputs is a dictionary of the GasHPWH_Parameters.From_Inputs arguments used for every combination, unless they're in Grid
+    #CO2_Multipliers is an optional (8760 x sets) dataframe of hourly electricity CO2 multipliers, as in Run_Draw_Profiles. The other arguments
+    #are the same as in Run_Draw_Profiles. The table is saved to Path_Output as a csv file if provided
+    #Combinations found in the cache of simulation totals aren't simulated again, unless Cache = False. None uses GasHPWH_RunCache.Use_Cache
+    #Path_Journal is an optional journal file, which records each finished draw profile so an interrupted sweep continues where it left off
+    if Workers is None:
+        Workers = os.cpu_count()
+    Combinations_Sweep = Combinations(Grid)
+    Names = list(dict.fromkeys(Name for Combination in Combinations_Sweep for Name in Combination)) #every swept input, in the order first used
+    Inputs_Sweep = [dict(Inputs, **Combination) for Combination in Combinations_Sweep]
+    Parameters = [GasHPWH.GasHPWH_Parameters.From_Inputs(**Inputs_Combination) for Inputs_Combination in Inputs_Sweep]
+    Table_Inputs = pd.DataFrame([{Name: Inputs_Combination[Name] for Name in Names} for Inputs_Combination in Inputs_Sweep], columns = Names)
+
+    if not isinstance(Draw_Profiles, pd.DataFrame):
+        Draw_Profiles = pd.DataFrame({'Path': list(Draw_Profiles)})
+    Draw_Profiles = Draw_Profiles.assign(File = [os.path.basename(Path) for Path in Draw_Profiles['Path']])
+    Columns_Profile = ['File'] + [Field for Field in GasHPWH_DrawProfile_Catalog.Fields_Name if Field in Draw_Profiles.columns]
+    Paths = list(Draw_Profiles['Path'])
+    Simulate = partial(Simulate_Sweep_Profile, Parameters = Parameters, Timestep = Timestep, Regression_COP = Regression_COP,
+                       Temperature_Tank_Initial = Temperature_Tank_Initial, Temperature_Ambient = Temperature_Ambient,
+                       Temperature_Water_Inlet = Temperature_Water_Inlet, CO2_Multipliers = CO2_Multipliers, Path_Weather = Path_Weather,
+                       Fraction_Outdoor = Fraction_Outdoor, Cache = Cache)
+    Settings = GasHPWH_Journal.Key_Job('Run_Sweep', GasHPWH_RunCache.Cache_Version, GasHPWH_RunCache.Hash_Model(), *Parameters, Timestep, Regression_COP,
+                                       Temperature_Tank_Initial, Temperature_Ambient, Temperature_Water_Inlet, CO2_Multipliers, Path_Weather, Fraction_Outdoor)
+    Keys = [GasHPWH_Journal.Key_Job(Settings, GasHPWH_DrawProfile_Cache.Key_Cache(Path, Timestep)) for Path in Paths] #Changes when the draw profile's contents change
+    Names = ['{0}: {1} combinations'.format(File, len(Parameters)) for File in Draw_Profiles['File']]
+    Totals_Profiles = Run_Jobs(Simulate, Paths, Names, Workers, Path_Journal, Keys)
+    if GasHPWH_RunCache.Use_Cache if Cache is None else Cache:
+        GasHPWH_RunCache.Evict_Cache() #Once per sweep, instead of after every draw profile
+
+    Tables = []
+    for (Index, Profile), Totals in zip(Draw_Profiles.iterrows(), Totals_Profiles):
+        Table = Table_Inputs.copy()
+        for Position, Column in enumerate(Columns_Profile):
+            Table.insert(Position, Column, Profile[Column])
+        Tables.append(pd.concat([Table, pd.DataFrame(Totals)], axis = 1)) #Totals read from the journal are a dictionary of columns
+
+    Results = pd.concat(Tables, ignore_index = True)
+    if Path_Output is not None:
+        Results.to_csv(Path_Output, index = False)
+    return Results